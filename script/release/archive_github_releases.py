@@ -9,30 +9,146 @@ be pruned. Pass --prune to delete releases older than the retention window.
 from __future__ import annotations
 
 import argparse
+import contextvars
+import filecmp
+import gzip
+import hashlib
+import http.client
 import json
+import mmap
 import os
 import re
+import shutil
+import sqlite3
 import subprocess
 import sys
-import urllib.error
+import tempfile
+import threading
+import time
 import urllib.parse
 import urllib.request
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Container, Iterable, Iterator
 
 
 DEFAULT_ARCHIVE = Path("release-notes/archive.md")
-API_ROOT = "https://api.github.com"
+ARCHIVE_HEADER = (
+    "# GitHub Release Notes Archive\n\n"
+    "This file is append-only. Use `script/release/archive_github_releases.py` "
+    "to append release bodies before pruning old GitHub releases.\n\n"
+)
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "nortools-release-archive"
+# GitHub Actions exports GITHUB_API_URL; it also lets a local stand-in server replace the API.
+API_ROOT = (os.environ.get("GITHUB_API_URL") or "https://api.github.com").rstrip("/")
+HTTP_TIMEOUT_SECONDS = 60
+MAX_IDLE_CONNECTIONS_PER_HOST = 8
+MAX_REDIRECTS = 5
+CACHED_HEADERS = ("etag", "last-modified", "link")
+RELEASES_PER_PAGE = 100
+# Fields release_entry() renders, plus the asset list for --mirror-assets; everything
+# else in the API payload is dropped on arrival.
+RELEASE_FIELDS = ("id", "tag_name", "name", "created_at", "published_at", "html_url", "body", "assets")
+# Fields kept per release once its notes are archived, for sorting, reporting and pruning.
+RELEASE_METADATA_FIELDS = ("id", "tag_name", "created_at", "published_at", "html_url", "assets")
+ASSET_FIELDS = ("id", "name", "size", "content_type", "url", "browser_download_url")
+# Stop issuing requests once this few remain in the primary rate-limit window.
+RATE_LIMIT_FLOOR = 5
+SECONDARY_RATE_LIMIT_BACKOFF_SECONDS = 60.0
+ARCHIVE_INDEX_SUFFIX = ".idx"
+ARCHIVE_INDEX_VERSION = 4
+# Matches start and end markers alike; no backreferences, so a scan is a single linear pass.
+MARKER_PATTERN = re.compile(rb"<!-- (/?)nortools-release-archive:([^>]+) -->")
+COPY_CHUNK_BYTES = 1 << 20
+PRUNE_PLAN_VERSION = 1
+SHARD_MANIFEST_NAME = "manifest.json"
+SHARD_MANIFEST_VERSION = 1
+UNDATED_SHARD = "undated"
+PUBLISHED_LINE_PATTERN = re.compile(rb"\n- Published: (\S+)")
+COLD_STORE_SUFFIX = ".cold"
+COLD_STORE_VERSION = 1
+SEARCH_DB_SUFFIX = ".sqlite"
+SEARCH_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    id INTEGER PRIMARY KEY,
+    tag TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    published TEXT NOT NULL,
+    url TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    pruned_at TEXT
+);
+CREATE INDEX IF NOT EXISTS releases_published ON releases (published);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes USING fts5 (tag, title, body);
+"""
+ENTRY_FIELDS_PATTERN = re.compile(
+    r"^## (?P<title>[^\n]*)\n\n- Tag: `[^`\n]*`\n- Published: (?P<published>[^\n]*)\n"
+    r"- GitHub release: (?P<url>[^\n]*)\n\n"
+    r"(?P<body>.*)\n\n<!-- /nortools-release-archive:",
+    re.M | re.S,
+)
+# Keep each batched 'git push --delete' well under the smallest (Windows) command-line limit.
+GIT_PUSH_ARGUMENT_BYTES = 24_000
+# Path options that need a distinct value per repository when several are archived at once.
+PER_REPO_PATH_OPTIONS = (
+    "archive",
+    "shard_dir",
+    "cold_store",
+    "search_db",
+    "state_file",
+    "prune_journal",
+    "plan_out",
+    "save_snapshot",
+)
+
+
+def non_negative_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {number}")
+    return number
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
         "--repo",
-        default=os.environ.get("GITHUB_REPOSITORY") or infer_repo_from_git(),
-        help="GitHub repository in owner/name form. Defaults to GITHUB_REPOSITORY or origin remote.",
+        nargs="+",
+        action="extend",
+        default=None,
+        help=(
+            "GitHub repositories in owner/name form; several are processed concurrently. "
+            "Defaults to GITHUB_REPOSITORY or origin remote."
+        ),
+    )
+    parser.add_argument(
+        "--repos-file",
+        default=None,
+        metavar="PATH",
+        help="File listing more repositories, one owner/name per line; '#' starts a comment.",
+    )
+    parser.add_argument(
+        "--repo-workers",
+        type=int,
+        default=4,
+        help="Repositories processed at the same time when several are given (default: 4).",
+    )
+    parser.add_argument(
+        "--archive",
+        default=str(DEFAULT_ARCHIVE),
+        help=(
+            "Append-only archive file path. With several repositories it may use {owner} and {name}; "
+            "otherwise each repository gets <archive dir>/<owner>/<name>/<archive name>."
+        ),
     )
-    parser.add_argument("--archive", default=str(DEFAULT_ARCHIVE), help="Append-only archive file path.")
     parser.add_argument("--keep", type=int, default=10, help="Number of newest GitHub releases to keep.")
     parser.add_argument(
         "--token-env",
@@ -66,13 +182,235 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Rewrite the archive file so archived release entries are newest first.",
     )
+    parser.add_argument(
+        "--shard-by",
+        choices=("year", "month"),
+        default=None,
+        help=(
+            "Keep the archive as one file per publication year or month under --shard-dir, with a "
+            "manifest.json recording shard order and tag ranges. An existing --archive file is split "
+            "into shards the first time."
+        ),
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=None,
+        help="Directory for the sharded archive. Defaults to --archive without its .md suffix.",
+    )
+    parser.add_argument(
+        "--export-archive",
+        default=None,
+        metavar="PATH",
+        help=(
+            "Write the archive as one concatenated markdown file to PATH and exit. Entries are sorted "
+            "newest published first and entries from the cold store follow the markdown entries."
+        ),
+    )
+    parser.add_argument(
+        "--search-db",
+        default=None,
+        metavar="PATH",
+        help=(
+            "SQLite full-text index of the archived notes, kept in sync on every run once it exists. "
+            "Defaults to --archive with a .sqlite suffix."
+        ),
+    )
+    parser.add_argument(
+        "--query",
+        default=None,
+        metavar="TEXT",
+        help=(
+            "Search the archived notes (SQLite FTS5 syntax, e.g. dns_health or 'dns NEAR timeout'), "
+            "print ranked matches and exit. Creates --search-db on first use."
+        ),
+    )
+    parser.add_argument("--since", default=None, metavar="DATE", help="Only show --query matches published on or after DATE.")
+    parser.add_argument("--until", default=None, metavar="DATE", help="Only show --query matches published on or before DATE.")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of --query matches to print (default: 20).")
+    parser.add_argument(
+        "--freeze-older-than",
+        type=int,
+        default=None,
+        metavar="DAYS",
+        help=(
+            "Move archived entries published more than DAYS ago out of the markdown archive into the "
+            "compressed --cold-store. Frozen notes stay readable per tag and are no longer refreshed."
+        ),
+    )
+    parser.add_argument(
+        "--cold-store",
+        default=None,
+        metavar="PATH",
+        help="Gzip block store for frozen entries. Defaults to --archive with a .cold suffix.",
+    )
+    parser.add_argument(
+        "--cold-block-entries",
+        type=int,
+        default=64,
+        help="Number of entries compressed together into one cold store block (default: 64).",
+    )
+    parser.add_argument(
+        "--refresh-changed",
+        action="store_true",
+        help=(
+            "Rewrite the notes of archived entries whose release body was edited on GitHub. Only the "
+            "body is compared and replaced; by default archived entries are never modified."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help="Directory for the conditional-request cache of release list pages.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the response cache and always download full release list pages.",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Delete all cached release list pages before fetching.",
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=1,
+        help=(
+            "Fetch release list pages concurrently with this many workers. Page 1 is read first to "
+            "find the last page from its Link header. Default 1 fetches pages one at a time."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Stop paging once a whole page holds only already-archived tags beyond the --keep window. "
+            "With --prune this only applies after a previous run left nothing older to delete."
+        ),
+    )
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help="Watermark state file for --incremental. Defaults to a per-repo file in --cache-dir.",
+    )
+    parser.add_argument(
+        "--save-snapshot",
+        default=None,
+        metavar="PATH",
+        help="Also record the fetched releases as JSON Lines (gzip-compressed if PATH ends in .gz).",
+    )
+    parser.add_argument(
+        "--from-snapshot",
+        default=None,
+        metavar="PATH",
+        help=(
+            "Read releases from a --save-snapshot file instead of the GitHub API. Archive, reorder and "
+            "print-notes then run fully offline; --prune and --incremental are not available."
+        ),
+    )
+    parser.add_argument(
+        "--plan-out",
+        default=None,
+        metavar="PATH",
+        help=(
+            "Archive (and reorder, if requested) as usual, then write the prune candidates with their "
+            "release ids and archive content hashes to PATH instead of deleting anything."
+        ),
+    )
+    parser.add_argument(
+        "--apply",
+        default=None,
+        metavar="PATH",
+        help=(
+            "Delete the releases listed in a --plan-out file without fetching the release list. "
+            "Releases whose archived notes no longer match the planned hash are skipped."
+        ),
+    )
+    parser.add_argument(
+        "--mirror-assets",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Before pruning, download the assets of releases about to be deleted into a content-addressed "
+            "store in DIR (blobs by SHA-256 plus per-release manifests). Releases whose assets fail to "
+            "download are not pruned."
+        ),
+    )
+    parser.add_argument(
+        "--mirror-workers",
+        type=int,
+        default=4,
+        help="Asset downloads running at the same time for --mirror-assets (default: 4).",
+    )
+    parser.add_argument(
+        "--prune-concurrency",
+        type=int,
+        default=1,
+        help=(
+            "Maximum number of releases deleted in parallel by --prune. GitHub recommends serial "
+            "mutating requests, so raise this only for large backlogs."
+        ),
+    )
+    parser.add_argument(
+        "--tag-backend",
+        choices=("api", "git"),
+        default="api",
+        help=(
+            "How --delete-tags removes tags. 'api' deletes one ref per API call; 'git' deletes them in "
+            "batched 'git push --delete' calls from the local clone and falls back to the API for failures."
+        ),
+    )
+    parser.add_argument(
+        "--git-remote",
+        default="origin",
+        help="Remote of the local clone used by --tag-backend git (default: origin).",
+    )
+    parser.add_argument(
+        "--prune-journal",
+        default=None,
+        metavar="PATH",
+        help=(
+            "Write-ahead journal of planned and completed deletions, used by --resume. Defaults to a "
+            "per-repo file in --cache-dir; keep it on persistent storage where the cache is discarded."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "With --prune, first finish the deletions planned by an interrupted run recorded in "
+            "--prune-journal without refetching, then fetch, archive and prune as usual."
+        ),
+    )
+    parser.add_argument(
+        "--metrics-json",
+        default=None,
+        metavar="PATH",
+        help=(
+            "Write a JSON summary of the run to PATH: every API call (endpoint, status, latency, bytes, "
+            "remaining rate limit), per-endpoint aggregates and the time spent in each phase."
+        ),
+    )
+    parser.add_argument(
+        "--trace-json",
+        default=None,
+        metavar="PATH",
+        help="Also write the phases and API calls as a Chrome trace (open in chrome://tracing or Perfetto).",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=non_negative_int,
+        default=5,
+        help="Retries per prune API call after a rate-limit or server error response.",
+    )
     return parser.parse_args()
 
 
-def infer_repo_from_git() -> str | None:
+def infer_repo_from_git(remote_name: str = "origin") -> str | None:
     try:
         result = subprocess.run(
-            ["git", "remote", "get-url", "origin"],
+            ["git", "remote", "get-url", remote_name],
             text=True,
             capture_output=True,
             check=True,
@@ -84,7 +422,460 @@ def infer_repo_from_git() -> str | None:
     return match.group("repo") if match else None
 
 
-def request_json(method: str, url: str, token: str | None, payload: Any = None) -> Any:
+class GitHubApiError(RuntimeError):
+    def __init__(self, method: str, url: str, status: int, headers: dict[str, str], detail: str) -> None:
+        super().__init__(f"GitHub API {method} {url} failed: {status} {detail}")
+        self.status = status
+        self.headers = headers
+        self.detail = detail
+
+
+@dataclass
+class ApiResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        if not self.body:
+            return None
+        return json.loads(self.body.decode("utf-8"))
+
+
+class HttpSession:
+    """Keep-alive HTTP(S) connections pooled per host, shared by every API call.
+
+    Connections are checked out exclusively, so concurrent page fetches and prune
+    workers each reuse their own socket instead of paying a new TCP+TLS handshake.
+    """
+
+    def __init__(self, timeout: float = HTTP_TIMEOUT_SECONDS, max_idle_per_host: int = MAX_IDLE_CONNECTIONS_PER_HOST) -> None:
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.connections_opened = 0
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, scheme: str, host: str, port: int) -> http.client.HTTPConnection:
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        proxy = urllib.request.getproxies().get("https") if scheme == "https" else None
+        if proxy and not urllib.request.proxy_bypass(host):
+            proxy_url = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            conn = connection_class(proxy_url.hostname or "", proxy_url.port or 80, timeout=self.timeout)
+            conn.set_tunnel(host, port)
+        else:
+            conn = connection_class(host, port, timeout=self.timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _checkout(self, key: tuple[str, str, int]) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(*key), False
+
+    def _checkin(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    def _split(url: str) -> tuple[tuple[str, str, int], str]:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or "https"
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        return key, target
+
+    def _open(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+    ) -> tuple[tuple[str, str, int], http.client.HTTPConnection, http.client.HTTPResponse]:
+        key, target = self._split(url)
+        while True:
+            conn, reused = self._checkout(key)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                return key, conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # The server closed an idle keep-alive socket; retry once on a fresh one.
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        if response.will_close or not response.isclosed():
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        key, conn, response = self._open(method, url, headers, body)
+        try:
+            payload = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        self._release(key, conn, response)
+        if response_headers.get("content-encoding", "").lower() == "gzip" and payload:
+            payload = gzip.decompress(payload)
+        return response.status, response_headers, payload
+
+    @contextmanager
+    def stream(self, url: str, headers: dict[str, str]) -> Iterator[tuple[int, dict[str, str], http.client.HTTPResponse]]:
+        """GET ``url`` following redirects and yield the unread response for chunked reads."""
+        for _ in range(MAX_REDIRECTS + 1):
+            key, conn, response = self._open("GET", url, headers, None)
+            response_headers = {name.lower(): value for name, value in response.getheaders()}
+            location = response_headers.get("location")
+            if response.status in (301, 302, 303, 307, 308) and location:
+                response.read()
+                self._release(key, conn, response)
+                next_url = urllib.parse.urljoin(url, location)
+                if urllib.parse.urlsplit(next_url).netloc != urllib.parse.urlsplit(url).netloc:
+                    headers = {name: value for name, value in headers.items() if name.lower() != "authorization"}
+                url = next_url
+                continue
+            try:
+                yield response.status, response_headers, response
+            except BaseException:
+                conn.close()
+                raise
+            self._release(key, conn, response)
+            return
+        raise RuntimeError(f"Too many redirects for GET {url}")
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None = None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        headers = {"Accept-Encoding": "gzip", **headers}
+        for _ in range(MAX_REDIRECTS + 1):
+            status, response_headers, payload = self._send(method, url, headers, body)
+            location = response_headers.get("location")
+            if status not in (301, 302, 303, 307, 308) or not location:
+                return status, response_headers, payload
+            next_url = urllib.parse.urljoin(url, location)
+            if urllib.parse.urlsplit(next_url).netloc != urllib.parse.urlsplit(url).netloc:
+                headers = {name: value for name, value in headers.items() if name.lower() != "authorization"}
+            if status == 303 or (status in (301, 302) and method != "GET"):
+                method, body = "GET", None
+            url = next_url
+        raise RuntimeError(f"Too many redirects for {method} {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+
+_http_session = HttpSession()
+
+
+def get_http_session() -> HttpSession:
+    return _http_session
+
+
+def set_http_session(session: HttpSession) -> HttpSession:
+    """Swap the shared session, e.g. to point at a stand-in server. Returns the previous one."""
+    global _http_session
+    previous, _http_session = _http_session, session
+    return previous
+
+
+class RateLimitBudget:
+    """Pause deadline shared by every API call once GitHub's rate limit runs low.
+
+    The primary limit belongs to the token rather than to a repository, so page
+    fetches and prune workers for every repository in a run draw on one budget.
+    """
+
+    def __init__(self) -> None:
+        self.throttled_seconds = 0.0
+        self._pause_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause_for(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            pause_until = max(self._pause_until, now + seconds)
+            # Count wall-clock pause time once, however many workers end up waiting on it.
+            self.throttled_seconds += pause_until - max(self._pause_until, now)
+            self._pause_until = pause_until
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                delay = self._pause_until - time.monotonic()
+                if delay <= 0:
+                    return
+            time.sleep(delay)
+
+    def observe(self, headers: dict[str, str]) -> None:
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset_at = float(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        if remaining <= RATE_LIMIT_FLOOR:
+            self.pause_for(max(0.0, reset_at - time.time()) + 1.0)
+
+
+_rate_limit_budget = RateLimitBudget()
+
+
+def get_rate_limit_budget() -> RateLimitBudget:
+    return _rate_limit_budget
+
+
+def api_path(url: str) -> str:
+    path = urllib.parse.urlsplit(url).path
+    root = urllib.parse.urlsplit(API_ROOT).path
+    return path[len(root) :] if url.startswith(API_ROOT) else path
+
+
+def url_template(url: str) -> str:
+    """Reduce an API URL to its endpoint shape, e.g. ``GET /repos/{owner}/{repo}/releases/{id}``."""
+    parts = urllib.parse.urlsplit(url)
+    path = api_path(url)
+    path = re.sub(r"^/repos/[^/]+/[^/]+", "/repos/{owner}/{repo}", path)
+    path = re.sub(r"/git/refs/tags/.+$", "/git/refs/tags/{tag}", path)
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path)
+    if parts.query:
+        path += "?" + "&".join(sorted(f"{key}={{{key}}}" for key in urllib.parse.parse_qs(parts.query)))
+    return path
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class RunMetrics:
+    """Per-call API log and phase timings behind --metrics-json and --trace-json.
+
+    Calls are recorded by api_request() (and asset downloads) from any thread.
+    Phases are wall-clock spans; ``fetch`` is the time spent waiting on the
+    release stream, so ``append`` is the rest of the streaming archive step.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.started = time.monotonic()
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self.calls: list[dict[str, Any]] = []
+        self.spans: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record_call(
+        self,
+        method: str,
+        url: str,
+        status: int | None,
+        started: float,
+        size: int,
+        headers: dict[str, str],
+    ) -> None:
+        if not self.enabled:
+            return
+        finished = time.monotonic()
+        repo = re.match(r"/repos/([^/]+/[^/]+)", api_path(url))
+        call = {
+            "method": method,
+            "endpoint": url_template(url),
+            "repo": repo.group(1) if repo else None,
+            "status": status,
+            "latency_ms": round((finished - started) * 1000, 3),
+            "bytes": size,
+            "rate_limit_remaining": int(headers["x-ratelimit-remaining"]) if headers.get("x-ratelimit-remaining", "").isdigit() else None,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "thread": threading.current_thread().name,
+        }
+        with self._lock:
+            self.calls.append(call)
+
+    def add_span(self, name: str, started: float, seconds: float, repo: str | None) -> None:
+        if not self.enabled:
+            return
+        span = {
+            "phase": name,
+            "repo": repo,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "seconds": seconds,
+            "thread": threading.current_thread().name,
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def phase(self, name: str, repo: str | None = None) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_span(name, started, time.monotonic() - started, repo)
+
+    def timed_stream(
+        self,
+        items: Iterable[Any],
+        name: str,
+        repo: str | None = None,
+        totals: list[float] | None = None,
+    ) -> Iterator[Any]:
+        """Yield ``items`` while timing how long producing them took as phase ``name``."""
+        iterator = iter(items)
+        started = time.monotonic()
+        waited = 0.0
+        try:
+            while True:
+                before = time.monotonic()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    waited += time.monotonic() - before
+                    return
+                waited += time.monotonic() - before
+                yield item
+        finally:
+            self.add_span(name, started, waited, repo)
+            if totals is not None:
+                totals.append(waited)
+
+    def summary(self) -> dict[str, Any]:
+        phases: dict[str, dict[str, Any]] = {}
+        for span in self.spans:
+            phase = phases.setdefault(span["phase"], {"seconds": 0.0, "count": 0})
+            phase["seconds"] = round(phase["seconds"] + span["seconds"], 6)
+            phase["count"] += 1
+        endpoints: dict[str, dict[str, Any]] = {}
+        latencies: dict[str, list[float]] = {}
+        for call in self.calls:
+            key = f"{call['method']} {call['endpoint']}"
+            endpoint = endpoints.setdefault(key, {"count": 0, "bytes": 0, "statuses": {}})
+            endpoint["count"] += 1
+            endpoint["bytes"] += call["bytes"]
+            status = str(call["status"])
+            endpoint["statuses"][status] = endpoint["statuses"].get(status, 0) + 1
+            latencies.setdefault(key, []).append(call["latency_ms"])
+        for key, values in latencies.items():
+            endpoints[key].update(
+                {
+                    "latency_ms_total": round(sum(values), 3),
+                    "latency_ms_p50": percentile(values, 0.5),
+                    "latency_ms_p95": percentile(values, 0.95),
+                    "latency_ms_max": max(values),
+                },
+            )
+        remaining = [call["rate_limit_remaining"] for call in self.calls if call["rate_limit_remaining"] is not None]
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.monotonic() - self.started, 6),
+            "phases": phases,
+            "api": {
+                "calls": len(self.calls),
+                "bytes": sum(call["bytes"] for call in self.calls),
+                "rate_limit_remaining_min": min(remaining) if remaining else None,
+                "rate_limit_throttled_seconds": round(get_rate_limit_budget().throttled_seconds, 3),
+                "connections_opened": get_http_session().connections_opened,
+                "endpoints": endpoints,
+            },
+            "phase_spans": self.spans,
+            "calls": self.calls,
+        }
+
+    def write_summary(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2) + "\n", encoding="utf-8")
+
+    def write_trace(self, path: Path) -> None:
+        """Write a Chrome trace (chrome://tracing, Perfetto) with one track per thread."""
+        threads: dict[str, int] = {}
+        events: list[dict[str, Any]] = []
+
+        def tid(thread: str) -> int:
+            if thread not in threads:
+                threads[thread] = len(threads) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": threads[thread], "args": {"name": thread}})
+            return threads[thread]
+
+        for span in self.spans:
+            events.append(
+                {
+                    "name": span["phase"],
+                    "cat": "phase",
+                    "ph": "X",
+                    "ts": round(span["start_ms"] * 1000),
+                    "dur": round(span["seconds"] * 1_000_000),
+                    "pid": 1,
+                    "tid": tid(span["thread"]),
+                    "args": {"repo": span["repo"]},
+                },
+            )
+        for call in self.calls:
+            events.append(
+                {
+                    "name": f"{call['method']} {call['endpoint']}",
+                    "cat": "api",
+                    "ph": "X",
+                    "ts": round(call["start_ms"] * 1000),
+                    "dur": round(call["latency_ms"] * 1000),
+                    "pid": 1,
+                    "tid": tid(call["thread"]),
+                    "args": {key: call[key] for key in ("repo", "status", "bytes", "rate_limit_remaining")},
+                },
+            )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}) + "\n", encoding="utf-8")
+
+
+_run_metrics = RunMetrics(enabled=False)
+
+
+def get_run_metrics() -> RunMetrics:
+    return _run_metrics
+
+
+def set_run_metrics(metrics: RunMetrics) -> RunMetrics:
+    global _run_metrics
+    previous, _run_metrics = _run_metrics, metrics
+    return previous
+
+
+def api_request(
+    method: str,
+    url: str,
+    token: str | None,
+    payload: Any = None,
+    extra_headers: dict[str, str] | None = None,
+) -> ApiResponse:
     data = None if payload is None else json.dumps(payload).encode("utf-8")
     headers = {
         "Accept": "application/vnd.github+json",
@@ -93,33 +884,294 @@ def request_json(method: str, url: str, token: str | None, payload: Any = None)
     }
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
+    if data is not None:
+        headers["Content-Type"] = "application/json"
+    if extra_headers:
+        headers.update(extra_headers)
+    budget = get_rate_limit_budget()
+    budget.wait()
+    started = time.monotonic()
+    try:
+        status, response_headers, body = get_http_session().request(method, url, headers, data)
+    except BaseException:
+        get_run_metrics().record_call(method, url, None, started, 0, {})
+        raise
+    get_run_metrics().record_call(method, url, status, started, len(body), response_headers)
+    budget.observe(response_headers)
+    if status >= 400:
+        detail = body.decode("utf-8", errors="replace")
+        raise GitHubApiError(method, url, status, response_headers, detail)
+    return ApiResponse(status=status, headers=response_headers, body=body)
+
+
+class ResponseCache:
+    """On-disk ETag/Last-Modified cache for GET requests.
+
+    A 304 Not Modified answer is served from the stored body and does not count
+    against the GitHub API rate limit.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.revalidated = 0
+        self.fetched = 0
+        self.stored = 0
+        self._lock = threading.Lock()
+
+    def _entry_path(self, url: str, token: str | None) -> Path:
+        # Authenticated listings include drafts, so never share entries across auth modes.
+        key = hashlib.sha256(f"{'auth' if token else 'anon'}:{url}".encode("utf-8")).hexdigest()
+        return self.root / f"{key}.json"
+
+    def _load(self, path: Path) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and isinstance(entry.get("body"), str) else None
+
+    def _store(self, path: Path, url: str, response: ApiResponse) -> None:
+        entry = {
+            "url": url,
+            "headers": {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+            "body": response.body.decode("utf-8"),
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(entry, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stored += 1
+
+    def get(self, url: str, token: str | None) -> ApiResponse:
+        path = self._entry_path(url, token)
+        entry = self._load(path)
+        conditional: dict[str, str] = {}
+        if entry:
+            cached_headers = entry.get("headers") or {}
+            if cached_headers.get("etag"):
+                conditional["If-None-Match"] = cached_headers["etag"]
+            if cached_headers.get("last-modified"):
+                conditional["If-Modified-Since"] = cached_headers["last-modified"]
+        response = api_request("GET", url, token, extra_headers=conditional)
+        if response.status == 304 and entry:
+            with self._lock:
+                self.revalidated += 1
+            headers = dict(entry.get("headers") or {})
+            headers.update(response.headers)
+            return ApiResponse(status=200, headers=headers, body=entry["body"].encode("utf-8"))
+        with self._lock:
+            self.fetched += 1
+        if response.status == 200 and any(name in response.headers for name in ("etag", "last-modified")):
+            self._store(path, url, response)
+        return response
+
+    def clear(self) -> int:
+        removed = 0
+        if not self.root.is_dir():
+            return removed
+        for path in self.root.glob("*.json"):
+            # Only the entries named by _entry_path(); watermark state files share the directory.
+            if not re.fullmatch(r"[0-9a-f]{64}", path.stem):
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def summary(self) -> str:
+        return (
+            f"Response cache: {self.revalidated} not modified (304), {self.fetched} downloaded, "
+            f"{self.stored} stored in {self.root}"
+        )
+
+
+def parse_link_header(value: str | None) -> dict[str, str]:
+    links: dict[str, str] = {}
+    for part in (value or "").split(","):
+        match = re.search(r'<(?P<url>[^>]+)>\s*;\s*rel="(?P<rel>[^"]+)"', part)
+        if match:
+            links[match.group("rel")] = match.group("url")
+    return links
+
+
+def last_page_number(response: ApiResponse) -> int | None:
+    last_url = parse_link_header(response.headers.get("link")).get("last")
+    if not last_url:
+        return None
+    pages = urllib.parse.parse_qs(urllib.parse.urlparse(last_url).query).get("page")
     try:
-        with urllib.request.urlopen(req, timeout=60) as response:
-            body = response.read()
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"GitHub API {method} {url} failed: {exc.code} {detail}") from exc
-    if not body:
+        return int(pages[0]) if pages else None
+    except ValueError:
         return None
-    return json.loads(body.decode("utf-8"))
 
 
-def fetch_releases(repo: str, token: str | None) -> list[dict[str, Any]]:
-    releases: list[dict[str, Any]] = []
-    page = 1
+def releases_page_url(repo: str, page: int) -> str:
     encoded_repo = urllib.parse.quote(repo, safe="/")
+    return f"{API_ROOT}/repos/{encoded_repo}/releases?per_page={RELEASES_PER_PAGE}&page={page}"
+
+
+def fetch_page(url: str, token: str | None, cache: ResponseCache | None) -> ApiResponse:
+    if cache is None:
+        return api_request("GET", url, token)
+    return cache.get(url, token)
+
+
+def iter_release_pages(
+    repo: str,
+    token: str | None,
+    cache: ResponseCache | None = None,
+    page_workers: int = 1,
+    stop_when: Callable[[int, list[dict[str, Any]]], bool] | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    # An early stop needs each page before deciding to fetch the next, so it always walks serially.
+    if page_workers > 1 and stop_when is None:
+        return iter_release_pages_concurrently(repo, token, cache, page_workers)
+    return iter_release_pages_serially(repo, token, cache, stop_when=stop_when)
+
+
+def iter_release_pages_serially(
+    repo: str,
+    token: str | None,
+    cache: ResponseCache | None,
+    start_page: int = 1,
+    stop_when: Callable[[int, list[dict[str, Any]]], bool] | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    page = start_page
+    position = (start_page - 1) * RELEASES_PER_PAGE
     while True:
-        url = f"{API_ROOT}/repos/{encoded_repo}/releases?per_page=100&page={page}"
-        batch = request_json("GET", url, token)
+        batch = fetch_page(releases_page_url(repo, page), token, cache).json()
         if not batch:
-            return releases
-        releases.extend(batch)
-        if len(batch) < 100:
-            return releases
+            return
+        yield batch
+        if len(batch) < RELEASES_PER_PAGE:
+            return
+        if stop_when is not None and stop_when(position, batch):
+            return
+        position += len(batch)
         page += 1
 
 
+class IncrementalStop:
+    """Page predicate for --incremental: stop at the first fully archived page past --keep."""
+
+    def __init__(self, archived: Container[str] | None, keep: int) -> None:
+        self.archived = archived
+        self.keep = keep
+        self.pages = 0
+        self.stopped = False
+
+    def __call__(self, position: int, batch: list[dict[str, Any]]) -> bool:
+        self.pages += 1
+        if self.archived is None or position < self.keep:
+            return False
+        self.stopped = all(str(release.get("tag_name") or "") in self.archived for release in batch)
+        return self.stopped
+
+
+def default_state_path(cache_dir: Path, repo: str) -> Path:
+    return cache_dir / f"state-{repo.replace('/', '__')}.json"
+
+
+def load_fetch_state(path: Path, repo: str) -> dict[str, Any]:
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) and state.get("repo") == repo else {}
+
+
+def save_fetch_state(path: Path, state: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def iter_release_pages_concurrently(
+    repo: str,
+    token: str | None,
+    cache: ResponseCache | None,
+    page_workers: int,
+) -> Iterator[list[dict[str, Any]]]:
+    first = fetch_page(releases_page_url(repo, 1), token, cache)
+    first_batch: list[dict[str, Any]] = list(first.json() or [])
+    if first_batch:
+        yield first_batch
+    last_page = last_page_number(first)
+    if last_page is None:
+        if len(first_batch) == RELEASES_PER_PAGE:
+            # No Link header to size the listing; finish the walk one page at a time.
+            yield from iter_release_pages_serially(repo, token, cache, start_page=2)
+        return
+
+    pending_pages = iter(range(2, last_page + 1))
+    in_flight: deque[Future[ApiResponse]] = deque()
+    with ThreadPoolExecutor(max_workers=page_workers, thread_name_prefix="releases-page") as pool:
+        # Keep a bounded window of requests ahead of the consumer and yield strictly in page
+        # order, so pages come out exactly as a serial walk would produce them.
+        for page in pending_pages:
+            in_flight.append(pool.submit(fetch_page, releases_page_url(repo, page), token, cache))
+            if len(in_flight) >= 2 * page_workers:
+                break
+        while in_flight:
+            batch = in_flight.popleft().result().json() or []
+            next_page = next(pending_pages, None)
+            if next_page is not None:
+                in_flight.append(pool.submit(fetch_page, releases_page_url(repo, next_page), token, cache))
+            if batch:
+                yield batch
+
+
+def project_releases(pages: Iterable[list[dict[str, Any]]]) -> Iterator[dict[str, Any]]:
+    seen_ids: set[Any] = set()
+    for page in pages:
+        for release in page:
+            release_id = release.get("id")
+            # A release published mid-walk shifts later pages by one; drop the repeated entry.
+            if release_id is not None:
+                if release_id in seen_ids:
+                    continue
+                seen_ids.add(release_id)
+            yield project_release(release)
+
+
+def project_release(release: dict[str, Any]) -> dict[str, Any]:
+    projected = {field: release.get(field) for field in RELEASE_FIELDS}
+    projected["assets"] = [{field: asset.get(field) for field in ASSET_FIELDS} for asset in release.get("assets") or []]
+    return projected
+
+
+def open_snapshot(path: Path, mode: str) -> Any:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="\n")
+    return path.open(mode, encoding="utf-8", newline="\n")
+
+
+def read_snapshot(path: Path) -> Iterator[dict[str, Any]]:
+    with open_snapshot(path, "r") as fh:
+        for line_number, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                release = json.loads(line)
+            except ValueError as exc:
+                raise RuntimeError(f"{path}:{line_number}: invalid snapshot line: {exc}") from exc
+            yield project_release(release)
+
+
+def record_snapshot(path: Path, releases: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open_snapshot(path, "w") as fh:
+        for release in releases:
+            fh.write(json.dumps(release, ensure_ascii=False, separators=(",", ":")))
+            fh.write("\n")
+            yield release
+
+
+def release_metadata(release: dict[str, Any]) -> dict[str, Any]:
+    return {field: release.get(field) for field in RELEASE_METADATA_FIELDS}
+
+
 def marker_for(tag: str) -> str:
     return f"<!-- nortools-release-archive:{tag} -->"
 
@@ -132,13 +1184,13 @@ def ensure_archive_file(path: Path) -> str:
     if path.exists():
         return path.read_text(encoding="utf-8")
     path.parent.mkdir(parents=True, exist_ok=True)
-    initial = (
-        "# GitHub Release Notes Archive\n\n"
-        "This file is append-only. Use `script/release/archive_github_releases.py` "
-        "to append release bodies before pruning old GitHub releases.\n\n"
-    )
-    path.write_text(initial, encoding="utf-8")
-    return initial
+    path.write_text(ARCHIVE_HEADER, encoding="utf-8")
+    return ARCHIVE_HEADER
+
+
+def release_body(release: dict[str, Any]) -> str:
+    body = str(release.get("body") or "").rstrip()
+    return body or "_No release notes body was published._"
 
 
 def release_entry(release: dict[str, Any]) -> str:
@@ -146,9 +1198,7 @@ def release_entry(release: dict[str, Any]) -> str:
     title = str(release.get("name") or tag)
     published = str(release.get("published_at") or release.get("created_at") or "unknown")
     url = str(release.get("html_url") or "")
-    body = str(release.get("body") or "").rstrip()
-    if not body:
-        body = "_No release notes body was published._"
+    body = release_body(release)
     return "\n".join(
         [
             marker_for(tag),
@@ -166,146 +1216,1975 @@ def release_entry(release: dict[str, Any]) -> str:
     )
 
 
-def archived_tag_order(content: str) -> list[str]:
-    return re.findall(r"<!-- nortools-release-archive:([^>]+) -->", content)
+@contextmanager
+def map_archive(path: Path) -> Iterator[mmap.mmap | bytes]:
+    with path.open("rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
 
 
-def append_missing_releases(archive_path: Path, releases: list[dict[str, Any]]) -> list[str]:
-    content = ensure_archive_file(archive_path)
-    appended: list[str] = []
-    with archive_path.open("a", encoding="utf-8", newline="\n") as fh:
-        for release in releases:
-            tag = str(release.get("tag_name") or "")
-            if not tag or marker_for(tag) in content:
-                continue
-            entry = release_entry(release)
-            fh.write("\n")
-            fh.write(entry)
-            content += "\n" + entry
-            appended.append(tag)
-    return appended
+def entry_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
 
 
-def split_archive(content: str) -> tuple[str, dict[str, str]]:
-    pattern = re.compile(
-        r"\n*(<!-- nortools-release-archive:(?P<tag>[^>]+) -->.*?<!-- /nortools-release-archive:(?P=tag) -->)\s*",
-        re.DOTALL,
-    )
-    entries: dict[str, str] = {}
-    first_match = pattern.search(content)
-    header = content[: first_match.start()] if first_match else content
-    for match in pattern.finditer(content):
-        entries[match.group("tag")] = match.group(1).rstrip() + "\n"
-    return header.rstrip() + "\n\n", entries
+def body_hash(span: bytes) -> str:
+    """Hash of the notes body inside an archived entry span, or "" if the span does not parse."""
+    match = ENTRY_FIELDS_PATTERN.search(span.decode("utf-8", errors="replace"))
+    return entry_hash(match.group("body").encode("utf-8")) if match else ""
+
+
+@dataclass
+class IndexEntry:
+    offset: int
+    length: int
+    sha: str
+    # Hash of the notes body alone, compared by --refresh-changed.
+    body_sha: str = ""
+
+
+@dataclass
+class MarkerDiagnostic:
+    kind: str
+    tag: str
+    offset: int
+
+    def __str__(self) -> str:
+        descriptions = {
+            "unterminated": "start marker has no matching end marker",
+            "orphan-end": "end marker has no open start marker",
+            "mismatched-end": "end marker closes a different tag than the open entry; the entry ends there",
+            "duplicate": "tag is archived more than once; the first entry is kept",
+        }
+        return f"{self.tag} at byte {self.offset}: {descriptions.get(self.kind, self.kind)}"
+
+
+@dataclass
+class ArchiveLayout:
+    header_end: int
+    entries: list[tuple[str, int, int]]
+    diagnostics: list[MarkerDiagnostic]
+
+    @property
+    def tags(self) -> list[str]:
+        return [tag for tag, _, _ in self.entries]
+
+
+def parse_archive_markers(data: mmap.mmap | bytes) -> ArchiveLayout:
+    """Walk all archive markers once, pairing start/end markers into entry spans.
+
+    Entries are ``(tag, start, end)`` byte spans covering start through end marker,
+    in file order. Unbalanced or repeated markers are reported as diagnostics.
+    """
+    entries: list[tuple[str, int, int]] = []
+    diagnostics: list[MarkerDiagnostic] = []
+    seen: set[str] = set()
+    header_end: int | None = None
+    open_tag: str | None = None
+    open_start = 0
+    for match in MARKER_PATTERN.finditer(data):
+        if header_end is None:
+            header_end = match.start()
+        tag = match.group(2).decode("utf-8", errors="replace")
+        if not match.group(1):
+            if open_tag is not None:
+                diagnostics.append(MarkerDiagnostic("unterminated", open_tag, open_start))
+            open_tag, open_start = tag, match.start()
+            continue
+        if open_tag is None:
+            diagnostics.append(MarkerDiagnostic("orphan-end", tag, match.start()))
+            continue
+        if tag != open_tag:
+            # Close the open entry here anyway so it cannot swallow the entries that follow.
+            diagnostics.append(MarkerDiagnostic("mismatched-end", tag, match.start()))
+        if open_tag in seen:
+            diagnostics.append(MarkerDiagnostic("duplicate", open_tag, open_start))
+        else:
+            entries.append((open_tag, open_start, match.end()))
+            seen.add(open_tag)
+        open_tag = None
+    if open_tag is not None:
+        diagnostics.append(MarkerDiagnostic("unterminated", open_tag, open_start))
+    return ArchiveLayout(len(data) if header_end is None else header_end, entries, diagnostics)
+
+
+class ArchiveIndex:
+    """Sidecar index mapping archived tags to their byte span in the archive.
+
+    Stored next to the archive as ``<archive>.idx``. Offsets cover the entry from
+    its start marker through its end marker. The index records the archive size
+    and mtime it describes and is rebuilt from the archive when those drift.
+    """
+
+    def __init__(self, archive_path: Path) -> None:
+        self.archive_path = archive_path
+        self.path = archive_path.with_name(archive_path.name + ARCHIVE_INDEX_SUFFIX)
+        self.entries: dict[str, IndexEntry] = {}
+        self.diagnostics: list[MarkerDiagnostic] = []
+
+    def __contains__(self, tag: str) -> bool:
+        # A start marker without its end marker still means the notes were archived once.
+        return tag in self.entries or any(item.tag == tag and item.kind == "unterminated" for item in self.diagnostics)
+
+    def tags(self) -> list[str]:
+        return list(self.entries)
+
+    @classmethod
+    def load(cls, archive_path: Path) -> ArchiveIndex:
+        index = cls(archive_path)
+        if not index._load_fresh():
+            index.rebuild()
+            index.save()
+        return index
+
+    def _load_fresh(self) -> bool:
+        try:
+            stat = self.archive_path.stat()
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get("version") != ARCHIVE_INDEX_VERSION:
+            return False
+        if data.get("archive_size") != stat.st_size or data.get("archive_mtime_ns") != stat.st_mtime_ns:
+            return False
+        try:
+            self.entries = {
+                tag: IndexEntry(offset, length, sha, body_sha) for tag, offset, length, sha, body_sha in data["entries"]
+            }
+            self.diagnostics = [MarkerDiagnostic(kind, tag, offset) for kind, tag, offset in data.get("diagnostics", [])]
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def rebuild(self) -> None:
+        with map_archive(self.archive_path) as data:
+            self._scan(data)
+
+    def _scan(self, data: mmap.mmap | bytes) -> None:
+        layout = parse_archive_markers(data)
+        self.entries = {
+            tag: IndexEntry(start, end - start, entry_hash(data[start:end]), body_hash(data[start:end]))
+            for tag, start, end in layout.entries
+        }
+        self.diagnostics = layout.diagnostics
+
+    def save(self) -> None:
+        stat = self.archive_path.stat()
+        data = {
+            "version": ARCHIVE_INDEX_VERSION,
+            "archive_size": stat.st_size,
+            "archive_mtime_ns": stat.st_mtime_ns,
+            "entries": [[tag, entry.offset, entry.length, entry.sha, entry.body_sha] for tag, entry in self.entries.items()],
+            "diagnostics": [[item.kind, item.tag, item.offset] for item in self.diagnostics],
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+class ArchiveAppender:
+    """Append release entries to the archive one at a time, keeping the index in step.
+
+    With ``refresh_changed`` an already archived release whose notes body no
+    longer matches the indexed body hash (it was edited on GitHub) has just that
+    body queued and spliced into place on exit; the archived title, date and URL
+    are kept. Only entries whose hash differs are read back from the archive.
+    """
+
+    def __init__(self, archive_path: Path, refresh_changed: bool = False, frozen: Container[str] = ()) -> None:
+        self.archive_path = archive_path
+        self.refresh_changed = refresh_changed
+        self.frozen = frozen
+        self.appended: list[str] = []
+        self.refreshed: list[str] = []
+        self._changed: dict[str, bytes] = {}
+
+    def __enter__(self) -> ArchiveAppender:
+        if not self.archive_path.exists():
+            ensure_archive_file(self.archive_path)
+        self.index = ArchiveIndex.load(self.archive_path)
+        self._reader = self.archive_path.open("rb") if self.refresh_changed else None
+        self._fh = self.archive_path.open("ab")
+        self._offset = self._fh.seek(0, os.SEEK_END)
+        return self
+
+    def append(self, release: dict[str, Any]) -> bool:
+        tag = str(release.get("tag_name") or "")
+        if not tag or tag in self.frozen:
+            return False
+        if tag in self.index:
+            existing = self.index.entries.get(tag)
+            if self._reader is not None and existing is not None and tag not in self.appended:
+                body = release_body(release)
+                if entry_hash(body.encode("utf-8")) != existing.body_sha:
+                    self._reader.seek(existing.offset)
+                    replacement = refreshed_entry(self._reader.read(existing.length), body)
+                    if replacement is not None:
+                        self._changed[tag] = replacement
+            return False
+        self.append_entry(tag, release_entry(release).encode("utf-8"))
+        return True
+
+    def append_entry(self, tag: str, entry: bytes) -> None:
+        self._fh.write(b"\n")
+        self._fh.write(entry)
+        span = entry.rstrip(b"\n")
+        self.index.entries[tag] = IndexEntry(self._offset + 1, len(span), entry_hash(span), body_hash(span))
+        self._offset += 1 + len(entry)
+        self.appended.append(tag)
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._fh.close()
+        if self._reader is not None:
+            self._reader.close()
+        if self._changed and exc_info[0] is None:
+            splice_archive_entries(self.archive_path, self.index, self._changed)
+            self.refreshed = list(self._changed)
+        elif self.appended:
+            self.index.save()
+
+
+def refreshed_entry(span: bytes, body: str) -> bytes | None:
+    """Return ``span`` with its notes body replaced by ``body``, or None if the span does not parse."""
+    text = span.decode("utf-8")
+    match = ENTRY_FIELDS_PATTERN.search(text)
+    if match is None:
+        return None
+    return (text[: match.start("body")] + body + text[match.end("body") :]).encode("utf-8")
+
+
+def archive_releases(
+    archive_path: Path,
+    releases: Iterable[dict[str, Any]],
+    refresh_changed: bool = False,
+    frozen: Container[str] = (),
+) -> tuple[list[dict[str, Any]], list[str], list[str]]:
+    """Archive releases as they stream past, keeping only their metadata afterwards.
+
+    Returns the metadata, the newly appended tags and the tags whose edited notes
+    were refreshed in place.
+    """
+    metadata: list[dict[str, Any]] = []
+    with ArchiveAppender(archive_path, refresh_changed, frozen) as appender:
+        for release in releases:
+            appender.append(release)
+            metadata.append(release_metadata(release))
+    return metadata, appender.appended, appender.refreshed
+
+
+def copy_range(source: mmap.mmap | bytes, start: int, length: int, out: Any) -> None:
+    end = start + length
+    while start < end:
+        chunk_end = min(end, start + COPY_CHUNK_BYTES)
+        out.write(source[start:chunk_end])
+        start = chunk_end
+
+
+def splice_archive_entries(archive_path: Path, index: ArchiveIndex, replacements: dict[str, bytes]) -> None:
+    """Replace the given entries' byte spans and shift the index to match.
+
+    Same-length replacements are written in place. Otherwise untouched byte ranges
+    are copied around the new entries into a temp file that replaces the archive.
+    """
+    spans = sorted(((index.entries[tag], tag) for tag in replacements), key=lambda item: item[0].offset)
+    if all(len(replacements[tag]) == entry.length for entry, tag in spans):
+        with archive_path.open("r+b") as fh:
+            for entry, tag in spans:
+                fh.seek(entry.offset)
+                fh.write(replacements[tag])
+                entry.sha = entry_hash(replacements[tag])
+                entry.body_sha = body_hash(replacements[tag])
+        index.save()
+        return
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{archive_path.name}.", dir=archive_path.parent)
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as out, map_archive(archive_path) as data:
+            position = 0
+            for entry, tag in spans:
+                copy_range(data, position, entry.offset - position, out)
+                out.write(replacements[tag])
+                position = entry.offset + entry.length
+            copy_range(data, position, len(data) - position, out)
+        shutil.copymode(archive_path, tmp_path)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    # (original offset, size change) per replaced span, captured before any entry is updated.
+    deltas = [(entry.offset, len(replacements[tag]) - entry.length) for entry, tag in spans]
+
+    def shifted(offset: int) -> int:
+        return offset + sum(delta for start, delta in deltas if start < offset)
+
+    for tag, entry in index.entries.items():
+        entry.offset = shifted(entry.offset)
+        if tag in replacements:
+            entry.length = len(replacements[tag])
+            entry.sha = entry_hash(replacements[tag])
+            entry.body_sha = body_hash(replacements[tag])
+    for diagnostic in index.diagnostics:
+        diagnostic.offset = shifted(diagnostic.offset)
+    index.save()
+
+
+def remove_archive_entries(archive_path: Path, index: ArchiveIndex, tags: Iterable[str]) -> None:
+    """Cut the given entries, and the blank lines after them, out of the archive."""
+    removed = set(tags)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{archive_path.name}.", dir=archive_path.parent)
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as out, map_archive(archive_path) as data:
+            cuts: list[tuple[int, int]] = []
+            for tag in removed:
+                entry = index.entries[tag]
+                end = entry.offset + entry.length
+                while data[end : end + 1] == b"\n":
+                    end += 1
+                cuts.append((entry.offset, end))
+            cuts.sort()
+            position = 0
+            for start, end in cuts:
+                copy_range(data, position, start - position, out)
+                position = end
+            copy_range(data, position, len(data) - position, out)
+        shutil.copymode(archive_path, tmp_path)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    def shifted(offset: int) -> int:
+        return offset - sum(end - start for start, end in cuts if end <= offset)
+
+    index.entries = {
+        tag: IndexEntry(shifted(entry.offset), entry.length, entry.sha, entry.body_sha)
+        for tag, entry in index.entries.items()
+        if tag not in removed
+    }
+    index.diagnostics = [
+        MarkerDiagnostic(item.kind, item.tag, shifted(item.offset))
+        for item in index.diagnostics
+        if not any(start <= item.offset < end for start, end in cuts)
+    ]
+    index.save()
+
+
+def unpaired_markers(index: ArchiveIndex) -> list[MarkerDiagnostic]:
+    """Marker problems that leave archive text outside every indexed entry."""
+    return [item for item in index.diagnostics if item.kind in ("unterminated", "orphan-end")]
 
 
 def reorder_archive_file(archive_path: Path, releases: list[dict[str, Any]]) -> list[str]:
-    content = ensure_archive_file(archive_path)
-    header, entries = split_archive(content)
+    if not archive_path.exists():
+        ensure_archive_file(archive_path)
+    index = ArchiveIndex.load(archive_path)
+    unpaired = unpaired_markers(index)
+    if unpaired:
+        # A rewrite only copies complete entries, so the unpaired text would be lost.
+        print(
+            f"Warning: not reordering {archive_path}: {len(unpaired)} unpaired archive markers "
+            f"(first: {unpaired[0]}); fix them by hand first",
+            file=sys.stderr,
+        )
+        return index.tags()
     ordered_tags: list[str] = []
     seen = set()
     for release in releases:
         tag = str(release.get("tag_name") or "")
-        if tag in entries and tag not in seen:
+        if tag in index.entries and tag not in seen:
             ordered_tags.append(tag)
             seen.add(tag)
-    for tag in archived_tag_order(content):
-        if tag in entries and tag not in seen:
+    for tag in index.tags():
+        if tag not in seen:
             ordered_tags.append(tag)
             seen.add(tag)
-    new_content = header + "\n".join(entries[tag].rstrip() for tag in ordered_tags) + "\n"
-    if new_content != content:
-        with archive_path.open("w", encoding="utf-8", newline="\n") as fh:
-            fh.write(new_content)
+    if not ordered_tags:
+        return ordered_tags
+
+    for item in index.diagnostics:
+        if item.kind == "duplicate":
+            print(f"Warning: reorder drops repeated archive entry {item.tag} at byte {item.offset}", file=sys.stderr)
+
+    # Only entry boundaries are held in memory; entry bytes are copied from the
+    # mapped archive into a temp file that atomically replaces the original.
+    header_end = min(entry.offset for entry in index.entries.values())
+    new_entries: dict[str, IndexEntry] = {}
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{archive_path.name}.", dir=archive_path.parent)
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as out, map_archive(archive_path) as data:
+            out.write(data[:header_end].rstrip() + b"\n\n")
+            for position, tag in enumerate(ordered_tags):
+                if position:
+                    out.write(b"\n")
+                entry = index.entries[tag]
+                new_entries[tag] = IndexEntry(out.tell(), entry.length, entry.sha, entry.body_sha)
+                copy_range(data, entry.offset, entry.length, out)
+            out.write(b"\n")
+        if tmp_path.stat().st_size == archive_path.stat().st_size and filecmp.cmp(tmp_path, archive_path, shallow=False):
+            tmp_path.unlink()
+            return ordered_tags
+        shutil.copymode(archive_path, tmp_path)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    index.entries = new_entries
+    # Stray markers outside the header are not copied into the reordered archive.
+    index.diagnostics = [item for item in index.diagnostics if item.offset < header_end]
+    index.save()
     return ordered_tags
 
 
-def print_release_notes(title: str, releases: list[dict[str, Any]]) -> None:
+class ColdStore:
+    """Gzip block store for archive entries moved out of the markdown archive.
+
+    Entries are packed a block at a time into independent gzip members appended to
+    one file, so reading a tag only decompresses its own block. The ``<store>.idx``
+    sidecar maps each tag to its block and byte span inside the decompressed block
+    and is rebuilt by walking the gzip members when it is missing or stale. A
+    corrupt or truncated member (e.g. from an interrupted freeze) ends the walk;
+    the next ``add`` overwrites it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.index_path = path.with_name(path.name + ARCHIVE_INDEX_SUFFIX)
+        self.blocks: list[tuple[int, int]] = []
+        self.entries: dict[str, tuple[int, IndexEntry]] = {}
+        self._cached_block: tuple[int, bytes] | None = None
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path: Path) -> ColdStore:
+        store = cls(path)
+        if path.exists() and not store._load_fresh():
+            store.rebuild()
+            store.save()
+        return store
+
+    def _load_fresh(self) -> bool:
+        try:
+            stat = self.path.stat()
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get("version") != COLD_STORE_VERSION:
+            return False
+        if data.get("store_size") != stat.st_size or data.get("store_mtime_ns") != stat.st_mtime_ns:
+            return False
+        try:
+            self.blocks = [(offset, length) for offset, length in data["blocks"]]
+            self.entries = {
+                tag: (block, IndexEntry(offset, length, sha)) for tag, block, offset, length, sha in data["entries"]
+            }
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def rebuild(self) -> None:
+        self.blocks, self.entries = [], {}
+        with map_archive(self.path) as data:
+            view = memoryview(data)
+            try:
+                position = 0
+                while position < len(view):
+                    decompressor = zlib.decompressobj(wbits=31)
+                    try:
+                        block = decompressor.decompress(view[position:])
+                    except zlib.error as exc:
+                        self._report_damage(position, len(view), str(exc))
+                        break
+                    if not decompressor.eof:
+                        self._report_damage(position, len(view), "truncated gzip member")
+                        break
+                    length = len(view) - position - len(decompressor.unused_data)
+                    self._index_block(len(self.blocks), block)
+                    self.blocks.append((position, length))
+                    position += length
+            finally:
+                view.release()
+
+    def _report_damage(self, position: int, size: int, reason: str) -> None:
+        print(
+            f"Warning: cold store {self.path}: {reason} at byte {position}; ignoring the last "
+            f"{size - position} bytes, which the next freeze overwrites. Frozen entries: {len(self.entries)}",
+            file=sys.stderr,
+        )
+
+    def _index_block(self, number: int, block: bytes) -> None:
+        for tag, start, end in parse_archive_markers(block).entries:
+            self.entries.setdefault(tag, (number, IndexEntry(start, end - start, entry_hash(block[start:end]))))
+
+    def save(self) -> None:
+        stat = self.path.stat()
+        data = {
+            "version": COLD_STORE_VERSION,
+            "store_size": stat.st_size,
+            "store_mtime_ns": stat.st_mtime_ns,
+            "blocks": [list(block) for block in self.blocks],
+            "entries": [[tag, block, entry.offset, entry.length, entry.sha] for tag, (block, entry) in self.entries.items()],
+        }
+        tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+
+    def add(self, spans: list[tuple[str, bytes]], block_entries: int) -> None:
+        spans = [(tag, span) for tag, span in spans if tag not in self.entries]
+        if not spans:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        end = self.blocks[-1][0] + self.blocks[-1][1] if self.blocks else 0
+        with self.path.open("r+b" if self.path.exists() else "wb") as fh:
+            # Drop any damaged tail the index walk stopped at before appending new blocks.
+            fh.truncate(end)
+            fh.seek(end)
+            for first in range(0, len(spans), block_entries):
+                block = b"".join(span + b"\n" for _, span in spans[first : first + block_entries])
+                compressed = gzip.compress(block, mtime=0)
+                self.blocks.append((fh.tell(), len(compressed)))
+                fh.write(compressed)
+                self._index_block(len(self.blocks) - 1, block)
+        self.save()
+
+    def block(self, number: int) -> bytes:
+        if self._cached_block is None or self._cached_block[0] != number:
+            offset, length = self.blocks[number]
+            with self.path.open("rb") as fh:
+                fh.seek(offset)
+                self._cached_block = (number, gzip.decompress(fh.read(length)))
+        return self._cached_block[1]
+
+    def read(self, tag: str) -> bytes | None:
+        if tag not in self.entries:
+            return None
+        number, entry = self.entries[tag]
+        return self.block(number)[entry.offset : entry.offset + entry.length]
+
+    def iter_entries(self) -> Iterator[bytes]:
+        for number, entry in self.entries.values():
+            yield self.block(number)[entry.offset : entry.offset + entry.length]
+
+
+class ArchiveStore(ABC):
+    """Common lookups over the archive file(s), their sidecar indexes and the cold store."""
+
+    label = ""
+    shard_by: str | None = None
+    cold: ColdStore | None = None
+
+    @abstractmethod
+    def indexes(self) -> list[tuple[Path, ArchiveIndex]]:
+        """Return each markdown archive file with its loaded index."""
+
+    def frozen(self) -> Container[str]:
+        return self.cold if self.cold is not None else ()
+
+    def archived(self) -> set[str]:
+        tags: set[str] = set(self.frozen())
+        for _, index in self.indexes():
+            tags.update(index.entries)
+            tags.update(item.tag for item in index.diagnostics if item.kind == "unterminated")
+        return tags
+
+    def lookup(self) -> dict[str, IndexEntry]:
+        entries: dict[str, IndexEntry] = {}
+        for _, index in self.indexes():
+            for tag, entry in index.entries.items():
+                entries.setdefault(tag, entry)
+        if self.cold is not None:
+            for tag, (_, entry) in self.cold.entries.items():
+                entries.setdefault(tag, entry)
+        return entries
+
+    def diagnostics(self) -> list[str]:
+        return [f"{path}: {item}" for path, index in self.indexes() for item in index.diagnostics]
+
+    def read_entries(self, tags: Iterable[str]) -> Iterator[tuple[str, str | None]]:
+        located: dict[str, tuple[Path, IndexEntry]] = {}
+        for path, index in self.indexes():
+            for tag, entry in index.entries.items():
+                located.setdefault(tag, (path, entry))
+        with ExitStack() as stack:
+            mapped: dict[Path, mmap.mmap | bytes] = {}
+            for tag in tags:
+                found = located.get(tag)
+                if found is None:
+                    frozen = self.cold.read(tag) if self.cold is not None else None
+                    yield tag, frozen.decode("utf-8") if frozen is not None else None
+                    continue
+                path, entry = found
+                if path not in mapped:
+                    mapped[path] = stack.enter_context(map_archive(path))
+                yield tag, mapped[path][entry.offset : entry.offset + entry.length].decode("utf-8")
+
+    def freeze(self, horizon: str, block_entries: int) -> list[str]:
+        """Move entries published before ``horizon`` into the cold store."""
+        if self.cold is None:
+            raise RuntimeError(f"{self.label} has no cold store to freeze entries into.")
+        frozen: list[str] = []
+        touched: list[Path] = []
+        for path, index in self.indexes():
+            spans: list[tuple[str, bytes]] = []
+            with map_archive(path) as data:
+                for tag, entry in index.entries.items():
+                    span = bytes(data[entry.offset : entry.offset + entry.length])
+                    published = PUBLISHED_LINE_PATTERN.search(span)
+                    if published is not None and published.group(1).decode("utf-8") < horizon:
+                        spans.append((tag, span))
+            if not spans:
+                continue
+            # Compressed copies are written before the markdown entries are cut, so an
+            # interrupted run at worst leaves entries in both places until the next freeze.
+            self.cold.add(spans, block_entries)
+            remove_archive_entries(path, index, [tag for tag, _ in spans])
+            frozen.extend(tag for tag, _ in spans)
+            touched.append(path)
+        self.frozen_from(touched)
+        return frozen
+
+    @abstractmethod
+    def frozen_from(self, paths: list[Path]) -> None:
+        """Update any bookkeeping for the archive files that ``freeze`` cut entries from."""
+
+    def export(self, path: Path) -> int:
+        """Write the markdown entries newest published first, followed by the cold store entries."""
+        written = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as out, ExitStack() as stack:
+                out.write(ARCHIVE_HEADER.rstrip().encode("utf-8") + b"\n\n")
+                # Shards that received appends are not in newest-first order yet, so sort every
+                # entry by its Published line; undated entries keep their order after the dated ones.
+                spans: list[tuple[bytes, mmap.mmap | bytes, IndexEntry]] = []
+                for archive_path, index in self.indexes():
+                    data = stack.enter_context(map_archive(archive_path))
+                    for entry in index.entries.values():
+                        published = PUBLISHED_LINE_PATTERN.search(data, entry.offset, entry.offset + entry.length)
+                        spans.append((published.group(1) if published else b"", data, entry))
+                spans.sort(key=lambda item: (item[0][:1].isdigit(), item[0]), reverse=True)
+                for _, data, entry in spans:
+                    if written:
+                        out.write(b"\n")
+                    copy_range(data, entry.offset, entry.length, out)
+                    written += 1
+                for span in self.cold.iter_entries() if self.cold is not None else ():
+                    if written:
+                        out.write(b"\n")
+                    out.write(span)
+                    written += 1
+                if written:
+                    out.write(b"\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return written
+
+
+class ArchiveFile(ArchiveStore):
+    """The single append-only archive file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.label = str(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def indexes(self) -> list[tuple[Path, ArchiveIndex]]:
+        return [(self.path, ArchiveIndex.load(self.path))] if self.path.exists() else []
+
+    def archive_releases(
+        self,
+        releases: Iterable[dict[str, Any]],
+        refresh_changed: bool = False,
+    ) -> tuple[list[dict[str, Any]], list[str], list[str]]:
+        return archive_releases(self.path, releases, refresh_changed, self.frozen())
+
+    def reorder(self, releases: list[dict[str, Any]]) -> list[str]:
+        return reorder_archive_file(self.path, releases)
+
+    def frozen_from(self, paths: list[Path]) -> None:
+        # The single file's sidecar index is already updated by remove_archive_entries().
+        pass
+
+
+def shard_key(published: str | None, shard_by: str) -> str:
+    match = re.match(r"(\d{4})-(\d{2})", published or "")
+    if match is None:
+        return UNDATED_SHARD
+    return match.group(1) if shard_by == "year" else f"{match.group(1)}-{match.group(2)}"
+
+
+class ShardedArchive(ArchiveStore):
+    """Archive split into one file per publication year or month.
+
+    ``manifest.json`` lists the shards newest first with their entry count, first
+    and last tag, and whether the shard is still in newest-first order. Each shard
+    is an ordinary archive file with its own index, so appends only write to the
+    shard a release belongs to and reorders skip shards that are already ordered.
+    """
+
+    def __init__(self, root: Path, shard_by: str) -> None:
+        self.root = root
+        self.shard_by = shard_by
+        self.label = str(root)
+        self.manifest_path = root / SHARD_MANIFEST_NAME
+        self.shards: dict[str, dict[str, Any]] = {}
+        self._indexes: dict[str, ArchiveIndex] = {}
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") != SHARD_MANIFEST_VERSION:
+                raise RuntimeError(f"Unsupported shard manifest version in {self.manifest_path}: {manifest.get('version')}")
+            if manifest.get("shard_by") != shard_by:
+                raise RuntimeError(f"{root} is sharded by {manifest.get('shard_by')}, not {shard_by}.")
+            self.shards = {str(shard["key"]): shard for shard in manifest.get("shards", [])}
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def shard_path(self, key: str) -> Path:
+        return self.root / f"{key}.md"
+
+    def keys(self) -> list[str]:
+        # Newest shard first; releases without a usable date sort after every dated shard.
+        return sorted(self.shards, key=lambda key: (key != UNDATED_SHARD, key), reverse=True)
+
+    def index(self, key: str) -> ArchiveIndex:
+        if key not in self._indexes:
+            self._indexes[key] = ArchiveIndex.load(self.shard_path(key))
+        return self._indexes[key]
+
+    def indexes(self) -> list[tuple[Path, ArchiveIndex]]:
+        return [(self.shard_path(key), self.index(key)) for key in self.keys() if self.shard_path(key).exists()]
+
+    def save_manifest(self, touched: Iterable[str]) -> None:
+        for key in touched:
+            tags = self.index(key).tags()
+            shard = self.shards.setdefault(key, {"key": key, "ordered": True})
+            shard.update(
+                {
+                    "file": self.shard_path(key).name,
+                    "entries": len(tags),
+                    "first_tag": tags[0] if tags else None,
+                    "last_tag": tags[-1] if tags else None,
+                },
+            )
+        manifest = {
+            "version": SHARD_MANIFEST_VERSION,
+            "shard_by": self.shard_by,
+            "shards": [self.shards[key] for key in self.keys()],
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def archive_releases(
+        self,
+        releases: Iterable[dict[str, Any]],
+        refresh_changed: bool = False,
+    ) -> tuple[list[dict[str, Any]], list[str], list[str]]:
+        # An already archived tag stays in its shard even if its publication date moved.
+        located = {tag: key for key in self.keys() for tag in self.index(key).entries}
+        metadata: list[dict[str, Any]] = []
+        appenders: dict[str, ArchiveAppender] = {}
+        with ExitStack() as stack:
+            for release in releases:
+                tag = str(release.get("tag_name") or "")
+                key = located.get(tag) or shard_key(release.get("published_at") or release.get("created_at"), self.shard_by)
+                if key not in appenders:
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    appenders[key] = stack.enter_context(ArchiveAppender(self.shard_path(key), refresh_changed, self.frozen()))
+                    self._indexes[key] = appenders[key].index
+                if appenders[key].append(release):
+                    located[tag] = key
+                metadata.append(release_metadata(release))
+        appended: list[str] = []
+        refreshed: list[str] = []
+        for key, appender in appenders.items():
+            appended.extend(appender.appended)
+            refreshed.extend(appender.refreshed)
+            if appender.appended:
+                self.shards.setdefault(key, {"key": key})["ordered"] = False
+        touched = [key for key, appender in appenders.items() if appender.appended or appender.refreshed]
+        if touched or not self.exists():
+            self.save_manifest(touched)
+        return metadata, appended, refreshed
+
+    def reorder(self, releases: list[dict[str, Any]]) -> list[str]:
+        ordered_tags: list[str] = []
+        reordered: list[str] = []
+        for key in self.keys():
+            if self.shards[key].get("ordered"):
+                ordered_tags.extend(self.index(key).tags())
+                continue
+            ordered_tags.extend(reorder_archive_file(self.shard_path(key), releases))
+            if unpaired_markers(self.index(key)):
+                # Left unchanged by reorder_archive_file(); keep it marked for a later reorder.
+                continue
+            self._indexes.pop(key, None)
+            self.shards[key]["ordered"] = True
+            reordered.append(key)
+        if reordered:
+            self.save_manifest(reordered)
+        return ordered_tags
+
+    def migrate(self, archive_path: Path) -> int:
+        """Split a single-file archive into shards by each entry's Published line."""
+        index = ArchiveIndex.load(archive_path)
+        appenders: dict[str, ArchiveAppender] = {}
+        self.root.mkdir(parents=True, exist_ok=True)
+        with ExitStack() as stack, map_archive(archive_path) as data:
+            for tag, entry in index.entries.items():
+                span = data[entry.offset : entry.offset + entry.length]
+                published = PUBLISHED_LINE_PATTERN.search(span)
+                key = shard_key(published.group(1).decode("utf-8") if published else None, self.shard_by)
+                if key not in appenders:
+                    appenders[key] = stack.enter_context(ArchiveAppender(self.shard_path(key)))
+                    self._indexes[key] = appenders[key].index
+                appenders[key].append_entry(tag, span + b"\n")
+        for key in appenders:
+            # Entries keep the single file's order, which is not necessarily newest first.
+            self.shards.setdefault(key, {"key": key})["ordered"] = False
+        self.save_manifest(appenders)
+        return len(index.entries)
+
+    def frozen_from(self, paths: list[Path]) -> None:
+        if paths:
+            self.save_manifest(path.stem for path in paths)
+
+
+def open_archive_store(args: argparse.Namespace) -> ArchiveStore:
+    archive_path = Path(args.archive)
+    store: ArchiveStore
+    if not args.shard_by:
+        store = ArchiveFile(archive_path)
+    else:
+        store = ShardedArchive(Path(args.shard_dir) if args.shard_dir else archive_path.with_suffix(""), args.shard_by)
+    store.cold = ColdStore.load(Path(args.cold_store) if args.cold_store else archive_path.with_suffix(COLD_STORE_SUFFIX))
+    if isinstance(store, ShardedArchive) and not store.exists() and archive_path.exists():
+        migrated = store.migrate(archive_path)
+        print(f"Split {archive_path} into {len(store.shards)} shards under {store.root}: {migrated} entries")
+        print(f"  {archive_path} is no longer updated; remove it once the shards are committed.")
+    return store
+
+
+def parse_archived_entry(text: str) -> dict[str, str]:
+    match = ENTRY_FIELDS_PATTERN.search(text)
+    if match is None:
+        return {"title": "", "published": "", "url": "", "body": text}
+    return {key: match.group(key) for key in ("title", "published", "url", "body")}
+
+
+class SearchIndex:
+    """SQLite FTS5 index over the archived release notes.
+
+    Rows are keyed by tag and remember the content hash of the archived entry, so
+    a sync only parses entries that were appended or refreshed since the last run
+    and drops entries that left the archive. Releases deleted from GitHub keep
+    their row with ``pruned_at`` set, since their notes are still archived.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        try:
+            self.db.executescript(SEARCH_INDEX_SCHEMA)
+        except sqlite3.OperationalError as exc:
+            self.db.close()
+            raise RuntimeError(f"SQLite at {path} cannot create the full-text index: {exc}") from exc
+
+    def close(self) -> None:
+        self.db.close()
+
+    def sync(self, store: ArchiveStore) -> tuple[int, int]:
+        entries = store.lookup()
+        known = dict(self.db.execute("SELECT tag, sha FROM releases"))
+        stale = [tag for tag in known if tag not in entries]
+        changed = [tag for tag, entry in entries.items() if known.get(tag) != entry.sha]
+        with self.db:
+            for tag in stale:
+                self.db.execute("DELETE FROM notes WHERE rowid = (SELECT id FROM releases WHERE tag = ?)", (tag,))
+                self.db.execute("DELETE FROM releases WHERE tag = ?", (tag,))
+            for tag, text in store.read_entries(changed):
+                if text is None:
+                    continue
+                fields = parse_archived_entry(text)
+                row = self.db.execute("SELECT id FROM releases WHERE tag = ?", (tag,)).fetchone()
+                values = (fields["title"], fields["published"], fields["url"], entries[tag].sha)
+                if row is None:
+                    rowid = self.db.execute(
+                        "INSERT INTO releases (title, published, url, sha, tag) VALUES (?, ?, ?, ?, ?)",
+                        (*values, tag),
+                    ).lastrowid
+                else:
+                    rowid = row[0]
+                    self.db.execute("UPDATE releases SET title = ?, published = ?, url = ?, sha = ? WHERE id = ?", (*values, rowid))
+                    self.db.execute("DELETE FROM notes WHERE rowid = ?", (rowid,))
+                self.db.execute(
+                    "INSERT INTO notes (rowid, tag, title, body) VALUES (?, ?, ?, ?)",
+                    (rowid, tag, fields["title"], fields["body"]),
+                )
+        return len(changed), len(stale)
+
+    def mark_pruned(self, tags: Iterable[str]) -> None:
+        pruned_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        with self.db:
+            self.db.executemany(
+                "UPDATE releases SET pruned_at = ? WHERE tag = ? AND pruned_at IS NULL",
+                [(pruned_at, tag) for tag in tags],
+            )
+
+    def query(self, text: str, since: str | None, until: str | None, limit: int) -> list[tuple[Any, ...]]:
+        # Tag and title matches outrank matches that only appear in the body.
+        return self.db.execute(
+            """
+            SELECT releases.tag, releases.published, releases.url, releases.pruned_at,
+                   snippet(notes, 2, '[', ']', '...', 12)
+            FROM notes JOIN releases ON releases.id = notes.rowid
+            WHERE notes MATCH ?
+              AND (? IS NULL OR releases.published >= ?)
+              AND (? IS NULL OR substr(releases.published, 1, length(?)) <= ?)
+            ORDER BY bm25(notes, 10.0, 5.0, 1.0)
+            LIMIT ?
+            """,
+            (text, since, since, until, until, until, limit),
+        ).fetchall()
+
+
+def search_db_path(args: argparse.Namespace, archive_path: Path, create: bool = False) -> Path | None:
+    if args.search_db:
+        return Path(args.search_db)
+    path = archive_path.with_suffix(SEARCH_DB_SUFFIX)
+    return path if create or path.exists() else None
+
+
+def sync_search_index(args: argparse.Namespace, store: ArchiveStore, archive_path: Path) -> None:
+    path = search_db_path(args, archive_path)
+    if path is None:
+        return
+    index = SearchIndex(path)
+    try:
+        with get_run_metrics().phase("search-index", args.repo):
+            changed, removed = index.sync(store)
+    finally:
+        index.close()
+    print(f"Search index {path}: {changed} entries indexed, {removed} removed")
+
+
+def mark_pruned_in_search_index(
+    args: argparse.Namespace,
+    archive_path: Path,
+    releases: list[dict[str, Any]],
+    journal: PruneJournal,
+) -> None:
+    path = search_db_path(args, archive_path)
+    if path is None:
+        return
+    index = SearchIndex(path)
+    try:
+        index.mark_pruned(str(release.get("tag_name") or "") for release in releases if release.get("id") in journal.done_releases)
+    finally:
+        index.close()
+
+
+def run_search_query(args: argparse.Namespace, store: ArchiveStore) -> int:
+    path = search_db_path(args, Path(args.archive), create=True)
+    assert path is not None
+    try:
+        index = SearchIndex(path)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    try:
+        index.sync(store)
+        try:
+            rows = index.query(args.query, args.since, args.until, args.limit)
+        except sqlite3.OperationalError as exc:
+            print(f"Invalid --query {args.query!r}: {exc}", file=sys.stderr)
+            return 2
+    finally:
+        index.close()
+    print(f"Matches for {args.query!r}: {len(rows)}")
+    for tag, published, url, pruned_at, snippet in rows:
+        status = f" (release deleted {pruned_at[:10]})" if pruned_at else ""
+        print(f"  {tag}  {published[:10]}  {url}{status}")
+        print(f"      {' '.join(snippet.split())}")
+    return 0
+
+
+def print_release_notes(title: str, store: ArchiveStore, releases: list[dict[str, Any]]) -> None:
     print(title)
     if not releases:
         print("  (none)")
         return
-    for release in releases:
-        tag = str(release.get("tag_name") or "untagged")
+    tags = [str(release.get("tag_name") or "untagged") for release in releases]
+    for tag, entry in store.read_entries(tags):
         print("")
         print(f"--- {tag} ---")
-        print(release_entry(release).rstrip())
+        print(entry if entry is not None else "_The archived entry has no end marker; see the archive warnings._")
 
 
-def delete_release(repo: str, release: dict[str, Any], token: str) -> None:
+def delete_release(repo: str, release: dict[str, Any], token: str) -> ApiResponse:
     release_id = release.get("id")
     if not release_id:
         raise RuntimeError(f"Release has no id: {release.get('tag_name')}")
     encoded_repo = urllib.parse.quote(repo, safe="/")
     url = f"{API_ROOT}/repos/{encoded_repo}/releases/{release_id}"
-    request_json("DELETE", url, token)
+    return api_request("DELETE", url, token)
 
 
-def delete_tag_ref(repo: str, tag: str, token: str) -> None:
+def delete_tag_ref(repo: str, tag: str, token: str) -> ApiResponse:
     encoded_repo = urllib.parse.quote(repo, safe="/")
     encoded_tag = urllib.parse.quote(f"tags/{tag}", safe="/")
     url = f"{API_ROOT}/repos/{encoded_repo}/git/refs/{encoded_tag}"
-    request_json("DELETE", url, token)
+    return api_request("DELETE", url, token)
+
+
+class PruneScheduler:
+    """Run prune jobs on a bounded pool while honouring GitHub rate-limit headers.
+
+    Every API call already waits on the shared rate-limit budget; on top of that
+    403/429 answers back off for Retry-After (or an exponential delay for
+    secondary limits) before retrying, pausing all workers on the same budget.
+    """
+
+    def __init__(self, concurrency: int, max_retries: int, budget: RateLimitBudget | None = None) -> None:
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.budget = budget or get_rate_limit_budget()
+        self.calls = 0
+        self.retries = 0
+        self.elapsed = 0.0
+        self._throttled_before = self.budget.throttled_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def throttled_seconds(self) -> float:
+        return self.budget.throttled_seconds - self._throttled_before
+
+    def log(self, message: str, error: bool = False) -> None:
+        with self._lock:
+            print(message, file=sys.stderr if error else sys.stdout, flush=True)
+
+    def retry_delay(self, exc: GitHubApiError, attempt: int) -> float | None:
+        retry_after = exc.headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return max(1.0, float(retry_after))
+            except ValueError:
+                pass
+        if exc.status in (403, 429):
+            if exc.headers.get("x-ratelimit-remaining") == "0" and exc.headers.get("x-ratelimit-reset"):
+                return max(1.0, float(exc.headers["x-ratelimit-reset"]) - time.time() + 1.0)
+            if "rate limit" in exc.detail.lower():
+                return SECONDARY_RATE_LIMIT_BACKOFF_SECONDS * (2**attempt)
+            return None
+        if exc.status >= 500:
+            return float(2**attempt)
+        return None
+
+    def call(self, operation: Callable[[], ApiResponse]) -> ApiResponse:
+        attempt = 0
+        while True:
+            with self._lock:
+                self.calls += 1
+            try:
+                response = operation()
+            except GitHubApiError as exc:
+                delay = self.retry_delay(exc, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                self.log(f"GitHub API returned {exc.status}; retry {attempt}/{self.max_retries} in {delay:.0f}s", error=True)
+                self.budget.pause_for(delay)
+                continue
+            return response
+
+    def run(self, jobs: list[tuple[str, Callable[[], None]]]) -> list[tuple[str, Exception]]:
+        failures: list[tuple[str, Exception]] = []
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="prune") as pool:
+            # Each job inherits the caller's context so its log lines land in the same repository report.
+            futures = {pool.submit(contextvars.copy_context().run, job): label for label, job in jobs}
+            for future in as_completed(futures):
+                exc = future.exception()
+                if exc is not None:
+                    failures.append((futures[future], exc))
+                    self.log(f"Failed to prune {futures[future]}: {exc}", error=True)
+        self.elapsed = time.monotonic() - started
+        return failures
+
+    def summary(self, job_count: int, failures: int) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"Prune summary: {job_count - failures}/{job_count} releases in {elapsed:.1f}s, "
+            f"{self.calls} API calls ({self.calls / elapsed:.1f}/s), {self.retries} retries, "
+            f"{self.throttled_seconds:.1f}s throttled, concurrency {self.concurrency}"
+        )
+
+
+def is_already_deleted(exc: GitHubApiError) -> bool:
+    # Deleting a missing release answers 404; a missing git ref answers 422 "Reference does not exist".
+    return exc.status == 404 or (exc.status == 422 and "reference does not exist" in exc.detail.lower())
+
+
+class PruneJournal:
+    """Append-only JSON Lines journal that makes --prune resumable.
+
+    The plan (releases to delete and whether tags go too) is written and synced
+    before the first DELETE; each finished deletion appends a "done" record. The
+    file is removed once every planned deletion has succeeded. A run that finishes
+    with failures appends a "complete" record instead, so only a run that was cut
+    short leaves a plan pending.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.done_releases: set[Any] = set()
+        self.done_tags: set[str] = set()
+        self._fh: Any = None
+        self._lock = threading.Lock()
+
+    def load_pending(self, repo: str) -> tuple[list[dict[str, Any]], bool] | None:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return None
+        plan: dict[str, Any] | None = None
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a torn final line; everything before it is intact.
+                continue
+            if record.get("op") == "plan":
+                plan = record
+            elif record.get("op") == "complete":
+                plan = None
+            elif record.get("op") == "done" and record.get("kind") == "release":
+                self.done_releases.add(record.get("id"))
+            elif record.get("op") == "done" and record.get("kind") == "tag":
+                self.done_tags.add(str(record.get("tag")))
+        if plan is None or plan.get("repo") != repo:
+            return None
+        return list(plan.get("releases") or []), bool(plan.get("delete_tags"))
+
+    def _append(self, record: dict[str, Any], sync: bool = False) -> None:
+        with self._lock:
+            if self._fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = self.path.open("a", encoding="utf-8", newline="\n")
+            self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._fh.flush()
+            if sync:
+                os.fsync(self._fh.fileno())
+
+    def start(self, repo: str, releases: list[dict[str, Any]], delete_tags: bool) -> None:
+        self.path.unlink(missing_ok=True)
+        self.done_releases.clear()
+        self.done_tags.clear()
+        planned = [{"id": release.get("id"), "tag_name": release.get("tag_name")} for release in releases]
+        self._append({"op": "plan", "repo": repo, "delete_tags": delete_tags, "releases": planned}, sync=True)
+
+    def record_release(self, release: dict[str, Any]) -> None:
+        self.done_releases.add(release.get("id"))
+        self._append({"op": "done", "kind": "release", "id": release.get("id"), "tag": release.get("tag_name")})
+
+    def record_tag(self, tag: str) -> None:
+        self.done_tags.add(tag)
+        self._append({"op": "done", "kind": "tag", "tag": tag})
+
+    def close(self, failures: int) -> None:
+        if failures:
+            self._append({"op": "complete", "failures": failures}, sync=True)
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+        if not failures:
+            self.path.unlink(missing_ok=True)
+
+
+def chunk_refs(refs: list[str], limit: int = GIT_PUSH_ARGUMENT_BYTES) -> Iterator[list[str]]:
+    chunk: list[str] = []
+    size = 0
+    for ref in refs:
+        if chunk and size + len(ref) + 1 > limit:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(ref)
+        size += len(ref) + 1
+    if chunk:
+        yield chunk
+
+
+def delete_tags_with_git(remote: str, tags: list[str], log: Callable[[str], None]) -> list[str]:
+    """Delete remote tags with batched 'git push --delete'. Returns the tags that failed."""
+    failed: list[str] = []
+    for chunk in chunk_refs([f"refs/tags/{tag}" for tag in tags]):
+        try:
+            result = subprocess.run(
+                ["git", "push", "--porcelain", remote, "--delete", *chunk],
+                text=True,
+                capture_output=True,
+            )
+        except OSError as exc:
+            log(f"git push --delete failed to start: {exc}")
+            failed.extend(ref.removeprefix("refs/tags/") for ref in chunk)
+            continue
+        deleted: set[str] = set()
+        # Porcelain lines look like "-\t:refs/tags/<tag>\t[deleted]"; "!" marks a rejected ref.
+        for line in result.stdout.splitlines():
+            fields = line.split("\t")
+            if len(fields) >= 2 and fields[0] in ("-", "=") and fields[1].startswith(":refs/tags/"):
+                deleted.add(fields[1].removeprefix(":refs/tags/"))
+        for match in re.finditer(r"unable to delete '(?:refs/tags/)?([^']+)': remote ref does not exist", result.stderr):
+            deleted.add(match.group(1))
+        for ref in chunk:
+            tag = ref.removeprefix("refs/tags/")
+            if tag in deleted:
+                log(f"Deleted tag {tag} (git push)")
+            else:
+                failed.append(tag)
+        if result.returncode != 0 and len(deleted) < len(chunk):
+            log(f"git push --delete left {len(chunk) - len(deleted)} tags: {result.stderr.strip()}")
+    return failed
+
+
+def default_journal_path(cache_dir: Path, repo: str) -> Path:
+    return cache_dir / f"prune-{repo.replace('/', '__')}.journal.jsonl"
+
+
+def prune_releases(
+    repo: str,
+    releases: list[dict[str, Any]],
+    token: str,
+    delete_tags: bool,
+    scheduler: PruneScheduler,
+    journal: PruneJournal | None = None,
+    git_remote: str | None = None,
+) -> int:
+    """Delete releases (and optionally their tags).
+
+    With ``git_remote`` the tags of successfully deleted releases are removed in
+    batched ``git push --delete`` calls afterwards; only tags git could not delete
+    go through the API.
+    """
+
+    def delete_idempotently(operation: Callable[[], ApiResponse], what: str) -> None:
+        try:
+            scheduler.call(operation)
+        except GitHubApiError as exc:
+            if not is_already_deleted(exc):
+                raise
+            scheduler.log(f"{what} was already deleted")
+            return
+        scheduler.log(f"Deleted {what}")
+
+    def delete_tag_job(tag: str) -> Callable[[], None]:
+        def run() -> None:
+            delete_idempotently(lambda: delete_tag_ref(repo, tag, token), f"tag {tag}")
+            if journal is not None:
+                journal.record_tag(tag)
+
+        return run
+
+    tags_for_git: list[str] = []
+
+    def prune_job(release: dict[str, Any]) -> Callable[[], None]:
+        def run() -> None:
+            tag = str(release.get("tag_name") or "")
+            if journal is None or release.get("id") not in journal.done_releases:
+                delete_idempotently(lambda: delete_release(repo, release, token), f"release {tag}")
+                if journal is not None:
+                    journal.record_release(release)
+            if delete_tags and tag and (journal is None or tag not in journal.done_tags):
+                if git_remote is not None:
+                    tags_for_git.append(tag)
+                else:
+                    delete_tag_job(tag)()
+
+        return run
+
+    started = time.monotonic()
+    jobs = [(str(release.get("tag_name") or release.get("id")), prune_job(release)) for release in releases]
+    failures = scheduler.run(jobs)
+    if tags_for_git and git_remote is not None:
+        # Keep the planned order so batches are deterministic regardless of worker scheduling.
+        order = {str(release.get("tag_name") or ""): position for position, release in enumerate(releases)}
+        tags_for_git.sort(key=lambda tag: order.get(tag, 0))
+        failed_tags = delete_tags_with_git(git_remote, tags_for_git, scheduler.log)
+        if journal is not None:
+            for tag in set(tags_for_git) - set(failed_tags):
+                journal.record_tag(tag)
+        if failed_tags:
+            scheduler.log(f"Falling back to the API for {len(failed_tags)} tags git push could not delete")
+            failures.extend(scheduler.run([(f"tag {tag}", delete_tag_job(tag)) for tag in failed_tags]))
+    get_run_metrics().add_span("prune", started, time.monotonic() - started, repo)
+    print(scheduler.summary(len(jobs), len(failures)))
+    if journal is not None:
+        journal.close(len(failures))
+        if failures:
+            print(f"Prune journal closed with {len(failures)} failures: {journal.path}; the next --prune run plans them again.")
+    return 1 if failures else 0
+
+
+def resolve_tag_remote(args: argparse.Namespace, repo: str) -> str | None:
+    if args.tag_backend != "git":
+        return None
+    if infer_repo_from_git(args.git_remote) != repo:
+        print(f"--tag-backend git: remote {args.git_remote!r} of this clone is not {repo}; using the API for tags.")
+        return None
+    return args.git_remote
+
+
+class AssetMirror:
+    """Content-addressed store for release assets, filled before releases are deleted.
+
+    Blobs live under ``blobs/sha256/<aa>/<digest>``, so a binary uploaded to several
+    releases or forks is stored once. Downloads stream into a ``.part`` file while
+    hashing and resume with a Range request after an interruption.
+    ``manifests/<owner>/<name>/<tag>.json`` maps each release's assets to digests.
+    """
+
+    def __init__(self, root: Path, token: str | None, workers: int) -> None:
+        self.root = root
+        self.token = token
+        self.workers = workers
+        self.downloaded_bytes = 0
+        self.downloaded = 0
+        self.deduplicated = 0
+        self.resumed = 0
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / "sha256" / digest[:2] / digest
+
+    def manifest_path(self, repo: str, tag: str) -> Path:
+        return self.root / "manifests" / repo / f"{urllib.parse.quote(tag, safe='')}.json"
+
+    def is_mirrored(self, repo: str, release: dict[str, Any]) -> bool:
+        try:
+            manifest = json.loads(self.manifest_path(repo, str(release.get("tag_name") or "")).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        mirrored = {item.get("id"): item.get("sha256") for item in manifest.get("assets") or []}
+        return all(
+            asset.get("id") in mirrored and self.blob_path(str(mirrored[asset.get("id")])).exists()
+            for asset in release.get("assets") or []
+        )
+
+    def download(self, asset: dict[str, Any]) -> str:
+        url = str(asset.get("url") or asset.get("browser_download_url") or "")
+        name = str(asset.get("name") or url)
+        size = asset.get("size")
+        part = self.root / "tmp" / f"asset-{asset.get('id') or hashlib.sha256(url.encode()).hexdigest()[:16]}.part"
+        part.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        offset = 0
+        if part.exists() and (size is None or part.stat().st_size <= size):
+            # Re-hash what an earlier run already wrote so the digest covers the whole file.
+            with part.open("rb") as fh:
+                for chunk in iter(lambda: fh.read(COPY_CHUNK_BYTES), b""):
+                    digest.update(chunk)
+                    offset += len(chunk)
+        headers = {"Accept": "application/octet-stream", "User-Agent": "nortools-release-archive"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if offset and offset != size:
+            headers["Range"] = f"bytes={offset}-"
+        if offset == 0 or offset != size:
+            budget = get_rate_limit_budget()
+            budget.wait()
+            started, received = time.monotonic(), 0
+            with get_http_session().stream(url, headers) as (status, response_headers, response):
+                budget.observe(response_headers)
+                if status == 206 and offset:
+                    mode = "ab"
+                    with self._lock:
+                        self.resumed += 1
+                elif status == 200:
+                    digest, offset, mode = hashlib.sha256(), 0, "wb"
+                else:
+                    detail = response.read(4096).decode("utf-8", errors="replace")
+                    raise GitHubApiError("GET", url, status, response_headers, detail)
+                with part.open(mode) as out:
+                    while chunk := response.read(COPY_CHUNK_BYTES):
+                        digest.update(chunk)
+                        out.write(chunk)
+                        offset += len(chunk)
+                        received += len(chunk)
+                        with self._lock:
+                            self.downloaded_bytes += len(chunk)
+            get_run_metrics().record_call("GET", url, status, started, received, response_headers)
+        if size is not None and offset != size:
+            raise RuntimeError(f"{name}: got {offset} of {size} bytes; the partial download is kept for the next run")
+        blob = self.blob_path(digest.hexdigest())
+        with self._lock:
+            if blob.exists():
+                part.unlink()
+                self.deduplicated += 1
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(part, blob)
+                self.downloaded += 1
+        return digest.hexdigest()
+
+    def mirror(self, repo: str, releases: list[dict[str, Any]]) -> list[str]:
+        """Mirror every asset of ``releases``; returns the tags that could not be fully mirrored."""
+        pending = [release for release in releases if release.get("assets") and not self.is_mirrored(repo, release)]
+        failed: list[str] = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mirror") as pool:
+            downloads = [
+                (release, [(asset, pool.submit(contextvars.copy_context().run, self.download, asset)) for asset in release["assets"]])
+                for release in pending
+            ]
+            for release, futures in downloads:
+                tag = str(release.get("tag_name") or "")
+                assets = []
+                for asset, future in futures:
+                    exc = future.exception()
+                    if exc is not None:
+                        print(f"Failed to mirror {tag} asset {asset.get('name')}: {exc}", file=sys.stderr)
+                        continue
+                    assets.append(
+                        {
+                            "id": asset.get("id"),
+                            "name": asset.get("name"),
+                            "size": asset.get("size"),
+                            "content_type": asset.get("content_type"),
+                            "sha256": future.result(),
+                        },
+                    )
+                if len(assets) != len(futures):
+                    failed.append(tag)
+                    continue
+                manifest = {"repo": repo, "tag": tag, "release_id": release.get("id"), "assets": assets}
+                path = self.manifest_path(repo, tag)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".json.tmp")
+                tmp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+                os.replace(tmp_path, path)
+        return failed
+
+    def summary(self, release_count: int) -> str:
+        return (
+            f"Asset mirror {self.root}: {release_count} releases checked, {self.downloaded} blobs stored, "
+            f"{self.deduplicated} duplicates skipped, {self.resumed} downloads resumed, "
+            f"{self.downloaded_bytes / (1 << 20):.1f} MiB transferred"
+        )
+
+
+def mirror_release_assets(args: argparse.Namespace, repo: str, token: str | None, releases: list[dict[str, Any]]) -> set[str]:
+    mirror = AssetMirror(Path(args.mirror_assets), token, args.mirror_workers)
+    with get_run_metrics().phase("mirror", repo):
+        failed = mirror.mirror(repo, releases)
+    print(mirror.summary(len(releases)))
+    if failed:
+        print(f"Not pruning {len(failed)} releases whose assets could not be mirrored: {', '.join(failed)}", file=sys.stderr)
+    return set(failed)
+
+
+def write_prune_plan(
+    path: Path,
+    repo: str,
+    store: ArchiveStore,
+    appended: list[str],
+    ordered_tags: list[str] | None,
+    prune_candidates: list[dict[str, Any]],
+    delete_tags: bool,
+) -> None:
+    entries = store.lookup()
+    prune = []
+    for release in prune_candidates:
+        tag = str(release.get("tag_name") or "")
+        entry = entries.get(tag)
+        prune.append(
+            {
+                "id": release.get("id"),
+                "tag_name": tag,
+                "created_at": release.get("created_at"),
+                "html_url": release.get("html_url"),
+                "assets": release.get("assets") or [],
+                "archive_sha": entry.sha if entry else None,
+            },
+        )
+    plan = {
+        "version": PRUNE_PLAN_VERSION,
+        "repo": repo,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "archive": store.label,
+        "shard_by": store.shard_by,
+        "cold_store": str(store.cold.path) if store.cold is not None else None,
+        "delete_tags": delete_tags,
+        "appended": appended,
+        "archive_order": ordered_tags,
+        "prune": prune,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(plan, indent=2) + "\n", encoding="utf-8")
+
+
+def apply_prune_plan(args: argparse.Namespace, token: str, cache_dir: Path) -> int:
+    plan_path = Path(args.apply)
+    try:
+        plan = json.loads(plan_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        print(f"Cannot read prune plan {plan_path}: {exc}", file=sys.stderr)
+        return 2
+    if plan.get("version") != PRUNE_PLAN_VERSION:
+        print(f"Unsupported prune plan version in {plan_path}: {plan.get('version')}", file=sys.stderr)
+        return 2
+    repo = str(plan.get("repo") or "")
+    if not re.fullmatch(r"[^/\s]+/[^/\s]+", repo):
+        print(f"Prune plan {plan_path} has no valid owner/name repository: {plan.get('repo')!r}", file=sys.stderr)
+        return 2
+    if args.repo_given and args.repo != repo:
+        print(f"Prune plan {plan_path} is for {repo}, not {args.repo}.", file=sys.stderr)
+        return 2
+
+    # Only delete releases whose notes are still archived exactly as they were when planned.
+    archive_path = Path(plan.get("archive") or args.archive)
+    store = ShardedArchive(archive_path, plan["shard_by"]) if plan.get("shard_by") else ArchiveFile(archive_path)
+    if plan.get("cold_store"):
+        store.cold = ColdStore.load(Path(plan["cold_store"]))
+    entries = store.lookup()
+    verified: list[dict[str, Any]] = []
+    refused: list[str] = []
+    for item in plan.get("prune") or []:
+        entry = entries.get(str(item.get("tag_name") or ""))
+        if entry is not None and item.get("archive_sha") and entry.sha == item["archive_sha"]:
+            verified.append(item)
+        else:
+            refused.append(str(item.get("tag_name") or item.get("id")))
+    print(f"Applying prune plan {plan_path}: {len(verified)} releases to delete from {repo}")
+    for tag in refused:
+        print(f"  skipping {tag}: archived notes are missing or changed since the plan was written", file=sys.stderr)
+    if args.mirror_assets and verified:
+        unmirrored = mirror_release_assets(args, repo, token, verified)
+        refused.extend(unmirrored)
+        verified = [item for item in verified if str(item.get("tag_name") or "") not in unmirrored]
+
+    journal = PruneJournal(Path(args.prune_journal) if args.prune_journal else default_journal_path(cache_dir, repo))
+    pending = journal.load_pending(repo)
+    planned_ids = {item.get("id") for item in verified}
+    if pending is None or {release.get("id") for release in pending[0]} != planned_ids:
+        journal.start(repo, verified, bool(plan.get("delete_tags")))
+    else:
+        print(f"Resuming the interrupted apply from {journal.path}")
+    scheduler = PruneScheduler(args.prune_concurrency, args.max_retries)
+    result = prune_releases(
+        repo,
+        verified,
+        token,
+        bool(plan.get("delete_tags")),
+        scheduler,
+        journal,
+        resolve_tag_remote(args, repo),
+    )
+    mark_pruned_in_search_index(args, archive_path, verified, journal)
+    return 1 if refused else result
+
+
+def read_repo_list(path: Path) -> list[str]:
+    repos = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        repo = line.split("#", 1)[0].strip()
+        if repo:
+            repos.append(repo)
+    return repos
+
+
+def repository_args(args: argparse.Namespace, repo: str) -> argparse.Namespace:
+    """Copy the options for one repository of a multi-repository run, expanding per-repo paths."""
+    owner, name = repo.split("/", 1)
+    repo_args = argparse.Namespace(**vars(args))
+    repo_args.repo = repo
+    for option in PER_REPO_PATH_OPTIONS:
+        value = getattr(args, option)
+        if not value:
+            continue
+        if "{" in value:
+            value = value.format(owner=owner, name=name)
+        else:
+            # Only --archive may omit the placeholders; main() rejects the others.
+            path = Path(value)
+            value = str(path.parent / owner / name / path.name)
+        setattr(repo_args, option, value)
+    return repo_args
+
+
+_captured_output: contextvars.ContextVar[list[tuple[Any, str]] | None] = contextvars.ContextVar(
+    "captured_output",
+    default=None,
+)
+
+
+class CapturedStream:
+    """Stand-in for sys.stdout/sys.stderr that holds back a repository's output.
+
+    Threads working for one repository of a multi-repository run append to that
+    repository's buffer (found through a context variable), so its report is
+    printed as one block instead of interleaving with the other repositories.
+    """
+
+    def __init__(self, stream: Any) -> None:
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        chunks = _captured_output.get()
+        if chunks is None:
+            return self.stream.write(text)
+        chunks.append((self.stream, text))
+        return len(text)
+
+    def flush(self) -> None:
+        if _captured_output.get() is None:
+            self.stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+def run_repositories(args: argparse.Namespace, repos: list[str], token: str | None) -> int:
+    def run(repo: str) -> tuple[int, float, list[tuple[Any, str]]]:
+        chunks: list[tuple[Any, str]] = []
+        _captured_output.set(chunks)
+        started = time.monotonic()
+        try:
+            result = run_repository(repository_args(args, repo), token)
+        except Exception as exc:
+            print(f"Failed: {type(exc).__name__}: {exc}", file=sys.stderr)
+            result = 1
+        return result, time.monotonic() - started, chunks
+
+    print(f"Processing {len(repos)} repositories with {min(args.repo_workers, len(repos))} workers")
+    results: dict[str, tuple[int, float]] = {}
+    streams = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = CapturedStream(sys.stdout), CapturedStream(sys.stderr)
+    try:
+        with ThreadPoolExecutor(max_workers=args.repo_workers, thread_name_prefix="repo") as pool:
+            futures = {pool.submit(contextvars.copy_context().run, run, repo): repo for repo in repos}
+            for future in as_completed(futures):
+                repo = futures[future]
+                result, elapsed, chunks = future.result()
+                results[repo] = (result, elapsed)
+                print(f"\n=== {repo} ===")
+                for stream, text in chunks:
+                    stream.write(text)
+                sys.stdout.flush()
+    finally:
+        sys.stdout, sys.stderr = streams
+
+    print("")
+    print("Repository results:")
+    for repo in repos:
+        result, elapsed = results[repo]
+        status = "ok" if result == 0 else f"failed (exit {result})"
+        print(f"  {repo}: {status} in {elapsed:.1f}s, archive {repository_args(args, repo).archive}")
+    print(
+        f"Shared session: {get_http_session().connections_opened} connections opened, "
+        f"{get_rate_limit_budget().throttled_seconds:.1f}s throttled by the rate limit"
+    )
+    return max(result for result, _ in results.values())
 
 
 def main() -> int:
     args = parse_args()
-    if not args.repo:
+    repos = list(args.repo or [])
+    if args.repos_file:
+        try:
+            repos.extend(read_repo_list(Path(args.repos_file)))
+        except OSError as exc:
+            print(f"Cannot read --repos-file: {exc}", file=sys.stderr)
+            return 2
+    # --apply takes the repository from the plan unless one was named explicitly.
+    args.repo_given = bool(repos)
+    if not repos:
+        default_repo = os.environ.get("GITHUB_REPOSITORY") or infer_repo_from_git()
+        repos = [default_repo] if default_repo else []
+    repos = list(dict.fromkeys(repos))
+    args.repo = repos[0] if repos else None
+    if len(repos) > 1:
+        if args.from_snapshot or args.apply or args.export_archive or args.query is not None:
+            print(
+                "--from-snapshot, --apply, --export-archive and --query work on one repository at a time.",
+                file=sys.stderr,
+            )
+            return 2
+        if any("/" not in repo for repo in repos):
+            print("Repositories must be given in owner/name form.", file=sys.stderr)
+            return 2
+        for option in PER_REPO_PATH_OPTIONS[1:]:
+            value = getattr(args, option)
+            if value and ("{owner}" not in value or "{name}" not in value):
+                flag = "--" + option.replace("_", "-")
+                print(f"{flag} must contain {{owner}} and {{name}} when several repositories are given.", file=sys.stderr)
+                return 2
+        if args.repo_workers < 1:
+            print("--repo-workers must be at least 1", file=sys.stderr)
+            return 2
+    if args.from_snapshot and (args.prune or args.incremental):
+        print("--from-snapshot runs offline and cannot be combined with --prune or --incremental.", file=sys.stderr)
+        return 2
+    if args.apply and (args.prune or args.plan_out or args.from_snapshot):
+        print("--apply only runs the deletions from a plan; drop --prune, --plan-out and --from-snapshot.", file=sys.stderr)
+        return 2
+    if args.resume and not args.prune:
+        print("--resume finishes an interrupted --prune run; pass it together with --prune.", file=sys.stderr)
+        return 2
+    if args.plan_out and not args.repo:
+        print("--plan-out records the repository to delete from; pass --repo owner/name.", file=sys.stderr)
+        return 2
+    if args.plan_out and args.prune:
+        print("--plan-out writes a plan instead of pruning; apply it later with --apply.", file=sys.stderr)
+        return 2
+    if args.export_archive and (args.prune or args.apply or args.plan_out):
+        print("--export-archive only writes the concatenated markdown archive; it does not fetch or prune.", file=sys.stderr)
+        return 2
+    if args.query is not None and (args.prune or args.apply or args.plan_out or args.export_archive):
+        print("--query only searches the archived notes; it does not fetch, export or prune.", file=sys.stderr)
+        return 2
+    if args.limit < 1:
+        print("--limit must be at least 1", file=sys.stderr)
+        return 2
+    if args.freeze_older_than is not None and args.freeze_older_than < 0:
+        print("--freeze-older-than must not be negative", file=sys.stderr)
+        return 2
+    if args.cold_block_entries < 1:
+        print("--cold-block-entries must be at least 1", file=sys.stderr)
+        return 2
+    if not args.repo and not args.from_snapshot and not args.apply and not args.export_archive and args.query is None:
         print("Repository is required. Pass --repo owner/name or set GITHUB_REPOSITORY.", file=sys.stderr)
         return 2
     if args.keep < 1:
         print("--keep must be at least 1", file=sys.stderr)
         return 2
+    if args.page_workers < 1:
+        print("--page-workers must be at least 1", file=sys.stderr)
+        return 2
+    if args.prune_concurrency < 1:
+        print("--prune-concurrency must be at least 1", file=sys.stderr)
+        return 2
+    if args.mirror_workers < 1:
+        print("--mirror-workers must be at least 1", file=sys.stderr)
+        return 2
 
     token = os.environ.get(args.token_env)
-    if args.prune and not token:
-        print(f"--prune requires ${args.token_env} with GitHub contents write access.", file=sys.stderr)
+    if (args.prune or args.apply) and not token:
+        option = "--prune" if args.prune else "--apply"
+        print(f"{option} requires ${args.token_env} with GitHub contents write access.", file=sys.stderr)
         return 2
+    metrics = RunMetrics(enabled=bool(args.metrics_json or args.trace_json))
+    set_run_metrics(metrics)
+    try:
+        if len(repos) > 1:
+            if args.clear_cache:
+                # The cache directory is shared by every repository, so clear it once up front.
+                cache = ResponseCache(Path(args.cache_dir))
+                print(f"Cleared response cache: {cache.clear()} entries removed from {cache.root}")
+                args.clear_cache = False
+            return run_repositories(args, repos, token)
+        return run_repository(args, token)
+    finally:
+        # Failed runs are the ones worth inspecting, so write these even when the run raised.
+        if args.metrics_json:
+            metrics.write_summary(Path(args.metrics_json))
+            print(f"Wrote run metrics for {len(metrics.calls)} API calls: {args.metrics_json}")
+        if args.trace_json:
+            metrics.write_trace(Path(args.trace_json))
+            print(f"Wrote Chrome trace: {args.trace_json}")
 
-    releases = fetch_releases(args.repo, token)
+
+def run_repository(args: argparse.Namespace, token: str | None) -> int:
+    try:
+        store = open_archive_store(args)
+    except (RuntimeError, ValueError) as exc:
+        print(f"Cannot open sharded archive: {exc}", file=sys.stderr)
+        return 2
+    if args.export_archive:
+        count = store.export(Path(args.export_archive))
+        print(f"Exported {count} archived entries from {store.label} to {args.export_archive}")
+        return 0
+    if args.query is not None:
+        return run_search_query(args, store)
+    cache = ResponseCache(Path(args.cache_dir))
+    if args.apply:
+        return apply_prune_plan(args, token or "", cache.root)
+    if args.clear_cache:
+        print(f"Cleared response cache: {cache.clear()} entries removed from {cache.root}")
+    resumed_result = 0
+    journal: PruneJournal | None = None
+    if args.prune:
+        journal = PruneJournal(Path(args.prune_journal) if args.prune_journal else default_journal_path(cache.root, args.repo))
+        pending = journal.load_pending(args.repo)
+        if pending is not None and args.resume:
+            # The planned releases were archived before the interrupted run started deleting them.
+            planned, planned_delete_tags = pending
+            remaining = [release for release in planned if release.get("id") not in journal.done_releases]
+            print(
+                f"Resuming interrupted prune from {journal.path}: "
+                f"{len(remaining)} of {len(planned)} releases still to delete before fetching."
+            )
+            scheduler = PruneScheduler(args.prune_concurrency, args.max_retries)
+            resumed_result = prune_releases(
+                args.repo,
+                planned,
+                token or "",
+                planned_delete_tags,
+                scheduler,
+                journal,
+                resolve_tag_remote(args, args.repo),
+            )
+            mark_pruned_in_search_index(args, Path(args.archive), planned, journal)
+        elif pending is not None:
+            print(f"Ignoring the interrupted prune plan in {journal.path}; pass --resume to finish it first.")
+        elif args.resume:
+            print(f"No interrupted prune plan in {journal.path}; pruning from the fetched releases.")
+    state: dict[str, Any] = {}
+    incremental: IncrementalStop | None = None
+    if args.incremental:
+        state_path = Path(args.state_file) if args.state_file else default_state_path(cache.root, args.repo)
+        state = load_fetch_state(state_path, args.repo)
+        if args.prune and not state.get("backlog_pruned"):
+            # Releases beyond the stop page may still need deleting; walk the full history once.
+            print(f"Incremental: no clean prune watermark in {state_path}; fetching the full release history.")
+        else:
+            incremental = IncrementalStop(store.archived(), args.keep)
+    if args.from_snapshot:
+        release_stream = read_snapshot(Path(args.from_snapshot))
+    else:
+        pages = iter_release_pages(args.repo, token, None if args.no_cache else cache, args.page_workers, incremental)
+        release_stream = project_releases(pages)
+    if args.save_snapshot:
+        release_stream = record_snapshot(Path(args.save_snapshot), release_stream)
+    # Bodies are written to the archive as each release arrives; only tag/date metadata is kept.
+    metrics = get_run_metrics()
+    fetch_seconds: list[float] = []
+    release_stream = metrics.timed_stream(release_stream, "fetch", args.repo, fetch_seconds)
+    archive_started = time.monotonic()
+    releases, appended, refreshed = store.archive_releases(release_stream, args.refresh_changed)
+    metrics.add_span("append", archive_started, time.monotonic() - archive_started - sum(fetch_seconds), args.repo)
+    if args.from_snapshot:
+        print(f"Loaded releases from snapshot: {args.from_snapshot}")
+    else:
+        print(cache.summary() if not args.no_cache else "Response cache: bypassed (--no-cache)")
+    if args.save_snapshot:
+        print(f"Saved release snapshot: {args.save_snapshot}")
+    if incremental is not None and incremental.stopped:
+        print(
+            f"Incremental: stopped after page {incremental.pages} of already-archived releases; "
+            "older releases were not listed."
+        )
     releases.sort(key=lambda item: str(item.get("created_at") or ""), reverse=True)
-    appended = append_missing_releases(Path(args.archive), releases)
+    for diagnostic in store.diagnostics():
+        print(f"Warning: archive marker problem: {diagnostic}", file=sys.stderr)
+    if args.freeze_older_than is not None:
+        horizon = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - args.freeze_older_than * 86400))
+        with metrics.phase("freeze", args.repo):
+            frozen = store.freeze(horizon, args.cold_block_entries)
+        print(f"Froze release notes published before {horizon}: {len(frozen)} entries moved to {store.cold.path}")
+    ordered_tags: list[str] | None = None
     if args.reorder_archive:
-        ordered_tags = reorder_archive_file(Path(args.archive), releases)
+        with metrics.phase("reorder", args.repo):
+            ordered_tags = store.reorder(releases)
         print(f"Reordered archive newest-first: {len(ordered_tags)} entries")
+    sync_search_index(args, store, Path(args.archive))
 
     prune_candidates = releases[args.keep :]
     appended_tags = set(appended)
     print(f"Fetched releases: {len(releases)}")
     print(f"Archived new release notes: {len(appended)}")
     if not appended:
-        print(f"Archive already contained all fetched release notes: {args.archive}")
+        print(f"Archive already contained all fetched release notes: {store.label}")
     for tag in appended:
         print(f"  archived {tag}")
+    if refreshed:
+        print(f"Refreshed edited release notes: {len(refreshed)}")
+        for tag in refreshed:
+            print(f"  refreshed {tag}")
     print(f"Retention: keeping newest {args.keep}; old releases: {len(prune_candidates)}")
 
     if args.print_notes:
         if args.print_notes == "appended":
             notes_to_print = [release for release in releases if str(release.get("tag_name") or "") in appended_tags]
-            print_release_notes("Release notes appended in this run:", notes_to_print)
+            print_release_notes("Release notes appended in this run:", store, notes_to_print)
         elif args.print_notes == "prune-candidates":
-            print_release_notes("Archived release notes for releases that would be pruned:", prune_candidates)
+            print_release_notes("Archived release notes for releases that would be pruned:", store, prune_candidates)
         elif args.print_notes == "all":
-            print_release_notes("All fetched release notes:", releases)
+            print_release_notes("All fetched release notes:", store, releases)
 
-    if not prune_candidates:
-        return 0
-
-    if not args.prune:
+    result = 0
+    if args.plan_out:
+        write_prune_plan(
+            Path(args.plan_out),
+            args.repo,
+            store,
+            appended,
+            ordered_tags,
+            prune_candidates,
+            args.delete_tags,
+        )
+        print(f"Wrote prune plan for {len(prune_candidates)} releases: {args.plan_out}")
+        print(f"Review it, then run --apply {args.plan_out} to delete them without refetching.")
+    elif prune_candidates and not args.prune:
         print("Dry run: pass --prune to delete old GitHub releases after archiving.")
         print("Use --print-notes prune-candidates to print archived notes for old releases before pruning.")
         for release in prune_candidates:
             print(f"  would prune {release.get('tag_name')} ({release.get('html_url')})")
-        return 0
+    elif prune_candidates:
+        to_prune = prune_candidates
+        if args.mirror_assets:
+            unmirrored = mirror_release_assets(args, args.repo, token, prune_candidates)
+            to_prune = [release for release in prune_candidates if str(release.get("tag_name") or "") not in unmirrored]
+        scheduler = PruneScheduler(args.prune_concurrency, args.max_retries)
+        if journal is not None:
+            journal.start(args.repo, to_prune, args.delete_tags)
+        result = prune_releases(
+            args.repo,
+            to_prune,
+            token or "",
+            args.delete_tags,
+            scheduler,
+            journal,
+            resolve_tag_remote(args, args.repo),
+        )
+        if journal is not None:
+            mark_pruned_in_search_index(args, Path(args.archive), to_prune, journal)
+        if len(to_prune) < len(prune_candidates):
+            result = 1
 
-    for release in prune_candidates:
-        tag = str(release.get("tag_name") or "")
-        delete_release(args.repo, release, token or "")
-        print(f"Deleted release {tag}")
-        if args.delete_tags and tag:
-            delete_tag_ref(args.repo, tag, token or "")
-            print(f"Deleted tag {tag}")
-    return 0
+    if args.incremental:
+        # Unlisted older releases are only known to be gone if an earlier run left the tail clean.
+        tail_clean = not (incremental is not None and incremental.stopped) or bool(state.get("backlog_pruned"))
+        save_fetch_state(
+            state_path,
+            {
+                "repo": args.repo,
+                "releases_listed": len(releases),
+                "backlog_pruned": tail_clean and (not prune_candidates or (args.prune and result == 0)),
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+        )
+    return max(result, resumed_result)
 
 
 if __name__ == "__main__":
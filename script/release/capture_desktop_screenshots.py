@@ -6,21 +6,42 @@ Pipeline:
 2. Launch the native desktop app.
 3. Wait until app is visible through AT-SPI (dogtail).
 4. Navigate selected UI routes via sidebar links.
-5. Capture screenshots via ImageMagick `import`.
+5. Grab the window into memory (MIT-SHM, else a plain X GetImage), check it
+   is not near-black, and encode the accepted frame as PNG. ImageMagick
+   `import`/`identify` remain the fallback (CAPTURE_SCREENSHOTS_USE_IMAGEMAGICK=1).
+
+Clicks, key presses and window geometry go through XTest on one persistent
+X connection when python-xlib is installed, with per-call `xdotool` as the
+fallback (forced with CAPTURE_SCREENSHOTS_USE_XDOTOOL=1).
+
+With `--workers N` the routes are sharded across N child captures. Each child
+runs in its own D-Bus session with its own Xvfb display, extracted app and
+AT-SPI navigator, and writes into the shared output directory.
 """
 
 from __future__ import annotations
 
 import argparse
+import ctypes
+import ctypes.util
 import html
+import importlib.util
+import itertools
 import os
 import re
+import shlex
 import shutil
 import signal
+import struct
 import subprocess
+import sys
 import tarfile
 import tempfile
+import threading
 import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
 from pathlib import Path
 
 
@@ -63,6 +84,9 @@ RESULT_SIGNALS: dict[str, tuple[list[str], bool, float]] = {
     "domain_health": (["report", "json"], True, 30.0),
 }
 MIN_ROUTE_SIGNAL_TIMEOUT_SECONDS = 30.0
+# With AT-SPI events, still re-walk the whole app this often in case the
+# toolkit does not emit change events for the result widgets.
+ROUTE_SIGNAL_RECHECK_SECONDS = 3.0
 
 
 def parse_args() -> argparse.Namespace:
@@ -82,6 +106,26 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Use an existing DISPLAY instead of starting Xvfb.",
     )
+    parser.add_argument(
+        "--window-manager",
+        help=(
+            "Window manager command to start on the Xvfb display, e.g. openbox "
+            "(default: none; --workers uses openbox when it is installed). Ignored with --no-xvfb."
+        ),
+    )
+    parser.add_argument(
+        "--routes",
+        help="Comma-separated route keys or filenames to capture (default: all routes).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Capture routes in parallel across this many Xvfb displays, each started with its own "
+            "window manager (default: 1). Cannot be combined with --no-xvfb."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -197,7 +241,365 @@ def find_window_id(display: str, app_pid: int | None = None, ignore_ids: set[str
     return _pick_best_window(display, candidates)
 
 
-def capture_screen(output_path: Path, display: str, window_id: str) -> None:
+class XImage(ctypes.Structure):
+    # Leading fields of Xlib's XImage; the struct is only read through pointers.
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+X_ZPIXMAP = 2
+X_LSB_FIRST = 0
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+
+def _load_library(name: str) -> ctypes.CDLL:
+    path = ctypes.util.find_library(name)
+    if path is None:
+        raise RuntimeError(f"lib{name} not found")
+    return ctypes.CDLL(path)
+
+
+# X error codes per open Display*, recorded by the one process-wide handler.
+_x_errors: dict[int, list[int]] = {}
+_x_error_handler_state: dict[str, object] = {"users": 0, "previous": None}
+
+
+def _record_x_error(dpy, event) -> int:
+    errors = _x_errors.get(dpy)
+    if errors is not None:
+        errors.append(int(event.contents.error_code))
+    return 0
+
+
+# XSetErrorHandler is process-wide, so the thunk lives at module level and
+# outlives every grabber that relies on it.
+_X_ERROR_THUNK = X_ERROR_HANDLER(_record_x_error)
+
+
+def _install_x_error_handler(x11: ctypes.CDLL) -> None:
+    # Xlib's default handler exits the process; record errors instead.
+    if _x_error_handler_state["users"] == 0:
+        _x_error_handler_state["previous"] = x11.XSetErrorHandler(_X_ERROR_THUNK)
+    _x_error_handler_state["users"] += 1
+
+
+def _release_x_error_handler(x11: ctypes.CDLL) -> None:
+    _x_error_handler_state["users"] -= 1
+    if _x_error_handler_state["users"] == 0:
+        previous = _x_error_handler_state["previous"]
+        _x_error_handler_state["previous"] = None
+        # A NULL handler reinstates Xlib's default.
+        x11.XSetErrorHandler(X_ERROR_HANDLER(previous or 0))
+
+
+class ScreenGrabber(ABC):
+    screen_width = 0
+    screen_height = 0
+
+    def frame(self, x: int, y: int, width: int, height: int) -> tuple[int, int, bytes]:
+        # Clip to the root window; X rejects root grabs that leave the screen.
+        left = max(0, x)
+        top = max(0, y)
+        right = min(self.screen_width, x + width)
+        bottom = min(self.screen_height, y + height)
+        if right <= left or bottom <= top:
+            raise RuntimeError(f"Capture region {width}x{height}+{x}+{y} is outside the screen")
+        return right - left, bottom - top, self.grab(left, top, right - left, bottom - top)
+
+    def root_frame(self) -> tuple[int, int, bytes]:
+        return self.frame(0, 0, self.screen_width, self.screen_height)
+
+    @abstractmethod
+    def grab(self, x: int, y: int, width: int, height: int) -> bytes:
+        """Return the region as packed BGRX rows, 4 bytes per pixel."""
+
+    def close(self) -> None:
+        pass
+
+
+class ShmScreenGrabber(ScreenGrabber):
+    def __init__(self, display: str):
+        x11 = _load_library("X11")
+        xext = _load_library("Xext")
+        libc = ctypes.CDLL(None, use_errno=True)
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XSetErrorHandler.argtypes = [X_ERROR_HANDLER]
+        x11.XSetErrorHandler.restype = ctypes.c_void_p
+        for fn in (x11.XDefaultScreen, x11.XDefaultDepth, x11.XDisplayWidth, x11.XDisplayHeight):
+            fn.restype = ctypes.c_int
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        for fn in (x11.XDefaultDepth, x11.XDisplayWidth, x11.XDisplayHeight, x11.XRootWindow, x11.XDefaultVisual):
+            fn.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XFree.argtypes = [ctypes.c_void_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.POINTER(XShmSegmentInfo),
+            ctypes.c_uint,
+            ctypes.c_uint,
+        ]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+        self.x11 = x11
+        self.xext = xext
+        self.libc = libc
+
+        self.dpy = None
+        self._errors: list[int] = []
+        self._segment: tuple[int, int, ctypes.POINTER(XImage), XShmSegmentInfo] | None = None
+        _install_x_error_handler(x11)
+        self._handler_installed = True
+        try:
+            self.dpy = x11.XOpenDisplay(display.encode())
+            if not self.dpy:
+                raise RuntimeError(f"Can't open display {display}")
+            self._errors = _x_errors.setdefault(self.dpy, [])
+            if not xext.XShmQueryExtension(self.dpy):
+                raise RuntimeError(f"MIT-SHM extension not available on display {display}")
+            screen = x11.XDefaultScreen(self.dpy)
+            self.root = x11.XRootWindow(self.dpy, screen)
+            self.visual = x11.XDefaultVisual(self.dpy, screen)
+            self.depth = x11.XDefaultDepth(self.dpy, screen)
+            self.screen_width = x11.XDisplayWidth(self.dpy, screen)
+            self.screen_height = x11.XDisplayHeight(self.dpy, screen)
+            self._attach(self.screen_width, self.screen_height)
+        except Exception:
+            self.close()
+            raise
+
+    def _attach(self, width: int, height: int) -> None:
+        self._detach()
+        info = XShmSegmentInfo()
+        image = self.xext.XShmCreateImage(self.dpy, self.visual, self.depth, X_ZPIXMAP, None, ctypes.byref(info), width, height)
+        if not image:
+            raise RuntimeError("XShmCreateImage failed")
+        img = image.contents
+        if img.bits_per_pixel != 32 or img.byte_order != X_LSB_FIRST or img.red_mask != 0xFF0000:
+            self.x11.XFree(image)
+            raise RuntimeError(f"Unsupported ZPixmap layout: {img.bits_per_pixel}bpp byte_order={img.byte_order}")
+        size = img.bytes_per_line * height
+        shmid = self.libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if shmid < 0:
+            self.x11.XFree(image)
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        addr = self.libc.shmat(shmid, None, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            self.libc.shmctl(shmid, IPC_RMID, None)
+            self.x11.XFree(image)
+            raise OSError(ctypes.get_errno(), "shmat failed")
+        info.shmid = shmid
+        info.shmaddr = addr
+        info.readOnly = 0
+        img.data = addr
+        self._segment = (width, height, image, info)
+        self._errors.clear()
+        self.xext.XShmAttach(self.dpy, ctypes.byref(info))
+        self.x11.XSync(self.dpy, 0)
+        # The server holds its own attachment now; drop the id so the
+        # segment disappears with the last detach.
+        self.libc.shmctl(shmid, IPC_RMID, None)
+        if self._errors:
+            raise RuntimeError(f"XShmAttach failed (X error {self._errors[-1]}); display is probably remote")
+
+    def _detach(self) -> None:
+        if self._segment is None:
+            return
+        _, _, image, info = self._segment
+        self._segment = None
+        self.xext.XShmDetach(self.dpy, ctypes.byref(info))
+        self.x11.XSync(self.dpy, 0)
+        image.contents.data = None
+        self.x11.XFree(image)
+        self.libc.shmdt(info.shmaddr)
+
+    def grab(self, x: int, y: int, width: int, height: int) -> bytes:
+        if self._segment is None or self._segment[:2] != (width, height):
+            self._attach(width, height)
+        _, _, image, _ = self._segment
+        self._errors.clear()
+        ok = self.xext.XShmGetImage(self.dpy, self.root, image, x, y, 0xFFFFFFFF)
+        self.x11.XSync(self.dpy, 0)
+        if not ok or self._errors:
+            raise RuntimeError(f"XShmGetImage failed for {width}x{height}+{x}+{y}")
+        img = image.contents
+        return _pack_rows(ctypes.string_at(img.data, img.bytes_per_line * height), width, height, img.bytes_per_line)
+
+    def close(self) -> None:
+        try:
+            self._detach()
+        finally:
+            if self.dpy:
+                self.x11.XCloseDisplay(self.dpy)
+                _x_errors.pop(self.dpy, None)
+                self.dpy = None
+            if self._handler_installed:
+                self._handler_installed = False
+                _release_x_error_handler(self.x11)
+
+
+class XlibScreenGrabber(ScreenGrabber):
+    def __init__(self, display: str):
+        from Xlib import X
+        from Xlib import display as xdisplay
+
+        self.X = X
+        self.conn = xdisplay.Display(display)
+        screen = self.conn.screen()
+        info = self.conn.display.info
+        bpp = {fmt.depth: fmt.bits_per_pixel for fmt in info.pixmap_formats}.get(screen.root_depth)
+        if bpp != 32 or info.image_byte_order != X.LSBFirst:
+            self.conn.close()
+            raise RuntimeError(f"Unsupported ZPixmap layout: depth={screen.root_depth} bpp={bpp}")
+        self.root = screen.root
+        self.screen_width = screen.width_in_pixels
+        self.screen_height = screen.height_in_pixels
+
+    def grab(self, x: int, y: int, width: int, height: int) -> bytes:
+        reply = self.root.get_image(x, y, width, height, self.X.ZPixmap, 0xFFFFFFFF)
+        return bytes(reply.data)
+
+    def close(self) -> None:
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def _pack_rows(data: bytes, width: int, height: int, stride: int) -> bytes:
+    row = width * 4
+    if stride == row:
+        return data[: row * height]
+    return b"".join(data[y * stride : y * stride + row] for y in range(height))
+
+
+_screen_grabbers: dict[str, ScreenGrabber | None] = {}
+
+
+def get_screen_grabber(display: str) -> ScreenGrabber | None:
+    if display in _screen_grabbers:
+        return _screen_grabbers[display]
+    grabber: ScreenGrabber | None = None
+    if not _env_flag("CAPTURE_SCREENSHOTS_USE_IMAGEMAGICK"):
+        for grabber_cls in (ShmScreenGrabber, XlibScreenGrabber):
+            try:
+                grabber = grabber_cls(display)
+                break
+            except Exception as exc:
+                print(f"[capture] {grabber_cls.__name__} unavailable: {exc}", flush=True)
+        if grabber is None:
+            print("[capture] in-memory capture unavailable; falling back to ImageMagick.", flush=True)
+    _screen_grabbers[display] = grabber
+    return grabber
+
+
+def close_screen_grabbers() -> None:
+    while _screen_grabbers:
+        _, grabber = _screen_grabbers.popitem()
+        if grabber is not None:
+            grabber.close()
+
+
+def in_memory_capture_available() -> bool:
+    if _env_flag("CAPTURE_SCREENSHOTS_USE_IMAGEMAGICK"):
+        return False
+    if ctypes.util.find_library("X11") and ctypes.util.find_library("Xext"):
+        return True
+    return importlib.util.find_spec("Xlib") is not None
+
+
+def frame_stats(width: int, height: int, pixels: bytes) -> tuple[int, float]:
+    # Mirrors `identify -colorspace gray -format "%k %[fx:mean]"`: distinct
+    # gray levels and mean Rec.709 luma in [0, 1].
+    counts: Counter[int] = Counter()
+    for color, count in Counter(memoryview(pixels).cast("I")).items():
+        counts[color & 0xFFFFFF] += count
+    levels: set[int] = set()
+    total = 0.0
+    for color, count in counts.items():
+        luma = (0.2126 * ((color >> 16) & 0xFF) + 0.7152 * ((color >> 8) & 0xFF) + 0.0722 * (color & 0xFF)) / 255.0
+        levels.add(round(luma * 65535))
+        total += luma * count
+    return len(levels), total / max(1, width * height)
+
+
+def write_png(output_path: Path, width: int, height: int, pixels: bytes) -> None:
+    rgb = bytearray(width * height * 3)
+    rgb[0::3] = pixels[2::4]
+    rgb[1::3] = pixels[1::4]
+    rgb[2::3] = pixels[0::4]
+    row = width * 3
+    raw = b"".join(b"\x00" + rgb[y * row : (y + 1) * row] for y in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+    temp_output = output_path.with_suffix(".tmp.png")
+    temp_output.write_bytes(png)
+    temp_output.replace(output_path)
+
+
+def window_capture_region(display: str, window_id: str) -> tuple[int, int, int, int]:
     geo = get_window_geometry(display, window_id)
     w = max(1, int(geo.get("WIDTH", 1200)))
     h = max(1, int(geo.get("HEIGHT", 800)))
@@ -205,6 +607,15 @@ def capture_screen(output_path: Path, display: str, window_id: str) -> None:
     y = int(geo.get("Y", 0))
     if w < 300 or h < 200:
         raise RuntimeError(f"Selected NorTools window is too small for capture: {w}x{h} (id={window_id})")
+    return x, y, w, h
+
+
+def capture_screen(output_path: Path, display: str, window_id: str) -> None:
+    x, y, w, h = window_capture_region(display, window_id)
+    grabber = get_screen_grabber(display)
+    if grabber is not None:
+        write_png(output_path, *grabber.frame(x, y, w, h))
+        return
     crop = f"{w}x{h}+{x}+{y}"
     subprocess.run(
         ["import", "-display", display, "-window", "root", "-crop", crop, "+repage", str(output_path)],
@@ -212,6 +623,14 @@ def capture_screen(output_path: Path, display: str, window_id: str) -> None:
     )
 
 
+def capture_root(output_path: Path, display: str) -> None:
+    grabber = get_screen_grabber(display)
+    if grabber is not None:
+        write_png(output_path, *grabber.root_frame())
+        return
+    subprocess.run(["import", "-display", display, "-window", "root", str(output_path)], check=True)
+
+
 def analyze_screenshot(output_path: Path) -> tuple[int, float]:
     result = subprocess.run(
         ["identify", "-colorspace", "gray", "-format", "%k %[fx:mean]", str(output_path)],
@@ -239,6 +658,50 @@ def capture_screen_with_retry(
     if max_attempts < 1:
         raise ValueError("max_attempts must be >= 1")
 
+    grabber = get_screen_grabber(display)
+    if grabber is None:
+        _capture_screen_with_retry_imagemagick(
+            output_path,
+            display,
+            window_id,
+            max_attempts=max_attempts,
+            retry_delay=retry_delay,
+            min_luma=min_luma,
+            min_colors=min_colors,
+        )
+        return
+
+    # Frames stay in memory until one is accepted, so only that one is encoded.
+    last_frame: tuple[int, int, bytes] | None = None
+    last_stats: tuple[int, float] | None = None
+    for attempt in range(1, max_attempts + 1):
+        last_frame = grabber.frame(*window_capture_region(display, window_id))
+        colors, mean_luma = frame_stats(*last_frame)
+        last_stats = (colors, mean_luma)
+        near_black = mean_luma < min_luma and colors <= min_colors
+        if not near_black:
+            write_png(output_path, *last_frame)
+            return
+        if attempt < max_attempts:
+            time.sleep(retry_delay)
+    write_png(output_path, *last_frame)
+    colors, mean_luma = last_stats
+    raise RuntimeError(
+        "Captured screenshot remained near-black after retries: "
+        f"{output_path.name} colors={colors} mean_luma={mean_luma:.4f}"
+    )
+
+
+def _capture_screen_with_retry_imagemagick(
+    output_path: Path,
+    display: str,
+    window_id: str,
+    *,
+    max_attempts: int,
+    retry_delay: float,
+    min_luma: float,
+    min_colors: int,
+) -> None:
     temp_output = output_path.with_suffix(".tmp.png")
     last_stats: tuple[int, float] | None = None
     try:
@@ -273,16 +736,236 @@ def get_active_window_id(display: str) -> str | None:
     return value or None
 
 
+class XdotoolInput:
+    def __init__(self, display: str):
+        self.display = display
+
+    def geometry(self, window_id: str) -> dict[str, int]:
+        result = run_cmd(["xdotool", "getwindowgeometry", "--shell", window_id], display=self.display)
+        values: dict[str, int] = {}
+        for line in result.stdout.splitlines():
+            if "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            if re.fullmatch(r"-?\d+", value.strip()):
+                values[key.strip()] = int(value.strip())
+        return values
+
+    def click(self, x: int, y: int) -> None:
+        run_cmd(["xdotool", "mousemove", "--sync", str(x), str(y), "click", "1"], display=self.display)
+
+    def key(self, *keys: str) -> None:
+        run_cmd(["xdotool", "key", *keys], display=self.display)
+
+    def type_text(self, text: str) -> None:
+        run_cmd(["xdotool", "type", "--delay", "1", text], display=self.display)
+
+    def focus_window(self, window_id: str) -> None:
+        run_cmd(["xdotool", "windowactivate", "--sync", window_id], display=self.display, check=False)
+
+    def close(self) -> None:
+        pass
+
+
+KEY_MODIFIERS = {
+    "ctrl": "Control_L",
+    "control": "Control_L",
+    "shift": "Shift_L",
+    "alt": "Alt_L",
+    "super": "Super_L",
+}
+
+
+class XlibInput:
+    def __init__(self, display: str):
+        from Xlib import X, XK
+        from Xlib import display as xdisplay
+        from Xlib.ext import xtest
+
+        self.X = X
+        self.XK = XK
+        self.xtest = xtest
+        self.display = display
+        self.conn = xdisplay.Display(display)
+        if not self.conn.has_extension("XTEST"):
+            self.conn.close()
+            raise RuntimeError(f"XTEST extension not available on display {display}")
+        self.root = self.conn.screen().root
+        # Top-level frames report moves and resizes through the root window.
+        self.root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        self.conn.sync()
+        self._geometry: dict[int, dict[str, int]] = {}
+        self._watched: set[int] = set()
+
+    def _drain_events(self) -> None:
+        X = self.X
+        while self.conn.pending_events():
+            event = self.conn.next_event()
+            if event.type in (X.ConfigureNotify, X.UnmapNotify, X.MapNotify, X.ReparentNotify, X.DestroyNotify):
+                self._geometry.clear()
+            if event.type == X.DestroyNotify:
+                self._watched.discard(event.window.id)
+
+    def geometry(self, window_id: str) -> dict[str, int]:
+        self._drain_events()
+        wid = int(window_id, 16) if window_id.lower().startswith("0x") else int(window_id)
+        cached = self._geometry.get(wid)
+        if cached is not None:
+            return dict(cached)
+        window = self.conn.create_resource_object("window", wid)
+        if wid not in self._watched:
+            # Subscribe before reading so a ConfigureNotify racing the query
+            # still invalidates the cached entry.
+            window.change_attributes(event_mask=self.X.StructureNotifyMask)
+            self._watched.add(wid)
+        geo = window.get_geometry()
+        origin = self.root.translate_coords(window, 0, 0)
+        values = {
+            "WINDOW": wid,
+            "X": int(origin.x),
+            "Y": int(origin.y),
+            "WIDTH": int(geo.width),
+            "HEIGHT": int(geo.height),
+            "SCREEN": self.conn.get_default_screen(),
+        }
+        self._geometry[wid] = values
+        return dict(values)
+
+    def click(self, x: int, y: int) -> None:
+        X = self.X
+        self.xtest.fake_input(self.conn, X.MotionNotify, x=x, y=y)
+        self.conn.sync()
+        self.xtest.fake_input(self.conn, X.ButtonPress, 1)
+        self.xtest.fake_input(self.conn, X.ButtonRelease, 1)
+        self.conn.sync()
+
+    def _keycode(self, keysym: int, label: str) -> int:
+        keycode = self.conn.keysym_to_keycode(keysym)
+        if not keycode:
+            raise RuntimeError(f"No keycode mapped for {label!r}")
+        return keycode
+
+    def _tap(self, keycodes: list[int]) -> None:
+        for keycode in keycodes:
+            self.xtest.fake_input(self.conn, self.X.KeyPress, keycode)
+        for keycode in reversed(keycodes):
+            self.xtest.fake_input(self.conn, self.X.KeyRelease, keycode)
+        self.conn.sync()
+
+    def key(self, *keys: str) -> None:
+        for combo in keys:
+            keycodes = []
+            for name in combo.split("+"):
+                keysym_name = KEY_MODIFIERS.get(name.lower(), name)
+                keysym = self.XK.string_to_keysym(keysym_name)
+                if not keysym:
+                    raise RuntimeError(f"Unknown key name: {name!r}")
+                keycodes.append(self._keycode(keysym, name))
+            self._tap(keycodes)
+
+    def type_text(self, text: str) -> None:
+        shift = self._keycode(self.XK.string_to_keysym("Shift_L"), "Shift_L")
+        for char in text:
+            # Latin-1 keysyms share their code points; other characters use 0x01000000 + code point.
+            keysym = ord(char) if ord(char) <= 0xFF else 0x01000000 | ord(char)
+            keycode = self.conn.keysym_to_keycode(keysym)
+            if not keycode:
+                # Not on the keymap; xdotool temporarily remaps a spare keycode to type it.
+                run_cmd(["xdotool", "type", "--delay", "1", char], display=self.display)
+                continue
+            if self.conn.keycode_to_keysym(keycode, 0) == keysym:
+                self._tap([keycode])
+            else:
+                self._tap([shift, keycode])
+
+    def _wm_supports_active_window(self) -> bool:
+        from Xlib import error as xerror
+
+        X = self.X
+        check_atom = self.conn.intern_atom("_NET_SUPPORTING_WM_CHECK")
+        try:
+            prop = self.root.get_full_property(check_atom, X.AnyPropertyType)
+            if prop is None or not prop.value:
+                return False
+            # A crashed WM leaves the root property behind; the check window
+            # only carries the same property while the WM is alive.
+            check_window = self.conn.create_resource_object("window", int(prop.value[0]))
+            child = check_window.get_full_property(check_atom, X.AnyPropertyType)
+            if child is None or not child.value or int(child.value[0]) != int(prop.value[0]):
+                return False
+            supported = self.root.get_full_property(self.conn.intern_atom("_NET_SUPPORTED"), X.AnyPropertyType)
+        except xerror.XError:
+            return False
+        return supported is not None and self.conn.intern_atom("_NET_ACTIVE_WINDOW") in supported.value
+
+    def focus_window(self, window_id: str) -> None:
+        from Xlib import error as xerror
+        from Xlib.protocol import event as xevent
+
+        X = self.X
+        wid = int(window_id, 16) if window_id.lower().startswith("0x") else int(window_id)
+        window = self.conn.create_resource_object("window", wid)
+        if not self._wm_supports_active_window():
+            # Nothing would answer _NET_ACTIVE_WINDOW; focus the window directly.
+            try:
+                window.set_input_focus(X.RevertToParent, X.CurrentTime)
+                self.conn.sync()
+            except xerror.XError:
+                pass
+            return
+
+        active_atom = self.conn.intern_atom("_NET_ACTIVE_WINDOW")
+        message = xevent.ClientMessage(
+            window=window,
+            client_type=active_atom,
+            data=(32, [2, X.CurrentTime, 0, 0, 0]),
+        )
+        try:
+            self.root.send_event(message, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+            self.conn.sync()
+        except xerror.XError:
+            return
+
+        def is_active() -> bool:
+            prop = self.root.get_full_property(active_atom, X.AnyPropertyType)
+            return bool(prop is not None and prop.value and int(prop.value[0]) == wid)
+
+        wait_for(is_active, timeout=2.0, interval=0.05)
+
+    def close(self) -> None:
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+_input_backends: dict[str, XdotoolInput | XlibInput] = {}
+
+
+def get_input_backend(display: str) -> XdotoolInput | XlibInput:
+    backend = _input_backends.get(display)
+    if backend is not None:
+        return backend
+    if _env_flag("CAPTURE_SCREENSHOTS_USE_XDOTOOL"):
+        backend = XdotoolInput(display)
+    else:
+        try:
+            backend = XlibInput(display)
+        except Exception as exc:
+            print(f"[capture] in-process X input unavailable ({exc}); falling back to xdotool.", flush=True)
+            backend = XdotoolInput(display)
+    _input_backends[display] = backend
+    return backend
+
+
+def close_input_backends() -> None:
+    while _input_backends:
+        _, backend = _input_backends.popitem()
+        backend.close()
+
+
 def get_window_geometry(display: str, window_id: str) -> dict[str, int]:
-    result = run_cmd(["xdotool", "getwindowgeometry", "--shell", window_id], display=display)
-    values: dict[str, int] = {}
-    for line in result.stdout.splitlines():
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        if re.fullmatch(r"-?\d+", value.strip()):
-            values[key.strip()] = int(value.strip())
-    return values
+    return get_input_backend(display).geometry(window_id)
 
 
 def window_is_usable(display: str, window_id: str, min_width: int = 600, min_height: int = 400) -> bool:
@@ -297,20 +980,21 @@ def xdotool_click(display: str, window_id: str, rel_x: int, rel_y: int) -> None:
     geo = get_window_geometry(display, window_id)
     x = geo.get("X", 0) + max(1, rel_x)
     y = geo.get("Y", 0) + max(1, rel_y)
-    run_cmd(["xdotool", "mousemove", "--sync", str(x), str(y), "click", "1"], display=display)
+    get_input_backend(display).click(x, y)
 
 
 def xdotool_type(display: str, text: str) -> None:
-    run_cmd(["xdotool", "key", "ctrl+a", "BackSpace"], display=display)
-    run_cmd(["xdotool", "type", "--delay", "1", text], display=display)
+    backend = get_input_backend(display)
+    backend.key("ctrl+a", "BackSpace")
+    backend.type_text(text)
 
 
 def xdotool_key(display: str, *keys: str) -> None:
-    run_cmd(["xdotool", "key", *keys], display=display)
+    get_input_backend(display).key(*keys)
 
 
 def xdotool_focus_window(display: str, window_id: str) -> None:
-    run_cmd(["xdotool", "windowactivate", "--sync", window_id], display=display, check=False)
+    get_input_backend(display).focus_window(window_id)
 
 
 def xdotool_fill_and_submit(
@@ -361,59 +1045,6 @@ class DogtailNavigator:
         for child in children:
             yield from self._walk(child)
 
-    def has_text_fragments(self, app, fragments: list[str], require_all: bool = True) -> bool:
-        wanted = [_normalize_text(fragment) for fragment in fragments if fragment]
-        if not wanted:
-            return False
-        matched = [False] * len(wanted)
-        for node in self._walk(app):
-            texts = [
-                _normalize_text(str(getattr(node, "name", "") or "")),
-                _normalize_text(str(getattr(node, "description", "") or "")),
-                _normalize_text(str(getattr(node, "text", "") or "")),
-            ]
-            for text in texts:
-                if not text:
-                    continue
-                for idx, needle in enumerate(wanted):
-                    if not matched[idx] and needle in text:
-                        matched[idx] = True
-            if require_all and all(matched):
-                return True
-            if not require_all and any(matched):
-                return True
-        return all(matched) if require_all else any(matched)
-
-    def fragment_debug_snapshot(self, app, fragments: list[str]) -> dict[str, object]:
-        wanted = [_normalize_text(fragment) for fragment in fragments if fragment]
-        matched = [False] * len(wanted)
-        matched_text: dict[str, str] = {}
-        samples: list[str] = []
-        scanned_nodes = 0
-        for node in self._walk(app):
-            scanned_nodes += 1
-            texts = [
-                _normalize_text(str(getattr(node, "name", "") or "")),
-                _normalize_text(str(getattr(node, "description", "") or "")),
-                _normalize_text(str(getattr(node, "text", "") or "")),
-            ]
-            for text in texts:
-                if not text:
-                    continue
-                if len(samples) < 8 and text not in samples:
-                    samples.append(text[:180])
-                for idx, needle in enumerate(wanted):
-                    if not matched[idx] and needle in text:
-                        matched[idx] = True
-                        matched_text[needle] = text[:220]
-        return {
-            "wanted": wanted,
-            "matched": matched,
-            "matched_text": matched_text,
-            "samples": samples,
-            "scanned_nodes": scanned_nodes,
-        }
-
     def find_app_root(self):
         from dogtail import tree
 
@@ -462,83 +1093,6 @@ class AtspiNavigator:
     def _normalize_name(name: str) -> str:
         return _normalize_text(name)
 
-    def has_text_fragments(self, app, fragments: list[str], require_all: bool = True) -> bool:
-        wanted = [self._normalize_name(fragment) for fragment in fragments if fragment]
-        if not wanted:
-            return False
-        matched = [False] * len(wanted)
-        for node in self._walk(app):
-            texts: list[str] = []
-            try:
-                texts.append(self._normalize_name(str(node.get_name() or "")))
-            except Exception:
-                pass
-            try:
-                texts.append(self._normalize_name(str(node.get_description() or "")))
-            except Exception:
-                pass
-            # Some GTK/AT-SPI widgets expose visible content via Atspi.Text and
-            # not via name/description. Probe this when available.
-            try:
-                char_count = int(self.Atspi.Text.get_character_count(node) or 0)
-                if char_count > 0:
-                    snippet = self.Atspi.Text.get_text(node, 0, min(char_count, 4096))
-                    texts.append(self._normalize_name(str(snippet or "")))
-            except Exception:
-                pass
-            for text in texts:
-                if not text:
-                    continue
-                for idx, needle in enumerate(wanted):
-                    if not matched[idx] and needle in text:
-                        matched[idx] = True
-            if require_all and all(matched):
-                return True
-            if not require_all and any(matched):
-                return True
-        return all(matched) if require_all else any(matched)
-
-    def fragment_debug_snapshot(self, app, fragments: list[str]) -> dict[str, object]:
-        wanted = [self._normalize_name(fragment) for fragment in fragments if fragment]
-        matched = [False] * len(wanted)
-        matched_text: dict[str, str] = {}
-        samples: list[str] = []
-        scanned_nodes = 0
-        for node in self._walk(app):
-            scanned_nodes += 1
-            texts: list[str] = []
-            try:
-                texts.append(self._normalize_name(str(node.get_name() or "")))
-            except Exception:
-                pass
-            try:
-                texts.append(self._normalize_name(str(node.get_description() or "")))
-            except Exception:
-                pass
-            try:
-                char_count = int(self.Atspi.Text.get_character_count(node) or 0)
-                if char_count > 0:
-                    snippet = self.Atspi.Text.get_text(node, 0, min(char_count, 4096))
-                    texts.append(self._normalize_name(str(snippet or "")))
-            except Exception:
-                pass
-            for text in texts:
-                if not text:
-                    continue
-                if len(samples) < 8 and text not in samples:
-                    samples.append(text[:180])
-                for idx, needle in enumerate(wanted):
-                    if not matched[idx] and needle in text:
-                        matched[idx] = True
-                        matched_text[needle] = text[:220]
-        return {
-            "wanted": wanted,
-            "matched": matched,
-            "matched_text": matched_text,
-            "samples": samples,
-            "scanned_nodes": scanned_nodes,
-        }
-
     def _iter_nortools_apps(self):
         return [app for app in self._iter_applications() if "nortools" in str(app.get_name() or "").lower()]
 
@@ -706,6 +1260,96 @@ def create_navigator():
         return DogtailNavigator()
 
 
+class AtspiSignalWatcher:
+    EVENTS = (
+        "object:text-changed",
+        "object:children-changed",
+        "object:property-change:accessible-name",
+    )
+
+    def __init__(self, navigator: AtspiNavigator):
+        from gi.repository import GLib
+
+        self.GLib = GLib
+        self.Atspi = navigator.Atspi
+        self.context = GLib.MainContext.default()
+        # Idempotent; hooks the AT-SPI bus into the default main context.
+        self.Atspi.init()
+        # Set once the app is resolved; events from other applications on the bus are dropped.
+        self.app = None
+        # Keyed by object path so a burst of events on one node queues it once.
+        self._changed: dict[object, object] = {}
+        self._listener = self.Atspi.EventListener.new(self._on_event)
+        self._registered: list[str] = []
+        try:
+            for event_type in self.EVENTS:
+                if not self._listener.register(event_type):
+                    raise RuntimeError(f"Could not register AT-SPI listener for {event_type}")
+                self._registered.append(event_type)
+        except Exception:
+            self.close()
+            raise
+
+    def _on_event(self, event) -> None:
+        event_type = str(getattr(event, "type", "") or "")
+        if event_type.endswith(":delete") or event_type.endswith(":remove"):
+            # Removed text or children cannot add a matching fragment.
+            return
+        node = event.source
+        if event_type.startswith("object:children-changed"):
+            child = getattr(event, "any_data", None)
+            if isinstance(child, self.Atspi.Accessible):
+                node = child
+        if node is None:
+            return
+        if self.app is not None:
+            try:
+                if node.get_application() != self.app:
+                    return
+            except Exception:
+                return
+        key = getattr(node, "path", None) or id(node)
+        if key not in self._changed:
+            self._changed[key] = node
+
+    def changed_nodes(self, timeout: float) -> list[object]:
+        if not self._changed:
+            expired = [False]
+
+            def on_timeout() -> bool:
+                expired[0] = True
+                return False
+
+            source_id = self.GLib.timeout_add(max(1, int(timeout * 1000)), on_timeout)
+            while not self._changed and not expired[0]:
+                self.context.iteration(True)
+            if not expired[0]:
+                self.GLib.source_remove(source_id)
+        # Drain events that are already queued so one burst is one re-check.
+        while self.context.pending():
+            self.context.iteration(False)
+        changed, self._changed = self._changed, {}
+        return list(changed.values())
+
+    def close(self) -> None:
+        for event_type in self._registered:
+            try:
+                self._listener.deregister(event_type)
+            except Exception:
+                pass
+        self._registered = []
+
+
+def create_signal_watcher(navigator) -> AtspiSignalWatcher | None:
+    if _env_flag("CAPTURE_SCREENSHOTS_POLL_ROUTE_SIGNALS") or not isinstance(navigator, AtspiNavigator):
+        return None
+    try:
+        return AtspiSignalWatcher(navigator)
+    except Exception as exc:
+        print(f"[capture] AT-SPI event listener unavailable ({exc}); polling route signals.", flush=True)
+        return None
+
+
 def _refresh_app_ref(navigator, app_ref: dict[str, object]) -> object | None:
     app = app_ref.get("app")
     if app is not None:
@@ -718,25 +1362,143 @@ def _refresh_app_ref(navigator, app_ref: dict[str, object]) -> object | None:
         return None
 
 
-def _collect_fragment_debug_snapshot(navigator, app_ref: dict[str, object], fragments: list[str]) -> dict[str, object] | None:
-    snapshot_fn = getattr(navigator, "fragment_debug_snapshot", None)
-    if not callable(snapshot_fn):
+# How stale a shared accessibility snapshot each probe may reuse, in seconds.
+SNAPSHOT_TTL_SECONDS = {
+    # The result predicate must see the current tree, so every poll walks it
+    # afresh (without roles); the probes below reuse that walk.
+    "predicate": 0.0,
+    # Progress logs are informational; reuse whatever the predicate walked.
+    "progress": 5.0,
+    # The timeout dump and final error message describe the same moment.
+    "artifacts": 2.0,
+}
+
+# Upper bound on nodes read per snapshot walk, so a runaway tree (large result
+# tables, virtualised lists) cannot stall a poll. Matches the old text-scan cap;
+# the timeout dump still keeps at most 1400 rows of it.
+SNAPSHOT_MAX_NODES = 1800
+
+
+class AccessibilitySnapshot:
+    def __init__(
+        self,
+        root,
+        nodes: list[tuple[str, str, str, str]],
+        with_roles: bool = True,
+        truncated: bool = False,
+    ):
+        self.root = root
+        self.nodes = nodes
+        self.with_roles = with_roles
+        self.truncated = truncated
+        self.taken_at = time.monotonic()
+        self._texts: list[str] | None = None
+
+    @classmethod
+    def capture(
+        cls,
+        navigator,
+        root,
+        with_roles: bool = True,
+        max_nodes: int = SNAPSHOT_MAX_NODES,
+    ) -> AccessibilitySnapshot:
+        # One walk; every node is read once for name, description, text and,
+        # unless only its texts are needed, its role.
+        nodes = [
+            _node_debug_fields(node, navigator, with_roles)
+            for node in itertools.islice(navigator._walk(root), max_nodes + 1)
+        ]
+        truncated = len(nodes) > max_nodes
+        return cls(root, nodes[:max_nodes], with_roles, truncated)
+
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    def texts(self) -> list[str]:
+        if self._texts is None:
+            self._texts = [
+                _normalize_text(value)
+                for _, name, description, text_value in self.nodes
+                for value in (name, description, text_value)
+                if value
+            ]
+        return self._texts
+
+    def has_text_fragments(self, fragments: list[str], require_all: bool = True) -> bool:
+        wanted = [_normalize_text(fragment) for fragment in fragments if fragment]
+        if not wanted:
+            return False
+        matched = [any(needle in text for text in self.texts()) for needle in wanted]
+        return all(matched) if require_all else any(matched)
+
+    def fragment_debug(self, fragments: list[str]) -> dict[str, object]:
+        wanted = [_normalize_text(fragment) for fragment in fragments if fragment]
+        matched = [False] * len(wanted)
+        matched_text: dict[str, str] = {}
+        samples: list[str] = []
+        for text in self.texts():
+            if len(samples) < 8 and text not in samples:
+                samples.append(text[:180])
+            for idx, needle in enumerate(wanted):
+                if not matched[idx] and needle in text:
+                    matched[idx] = True
+                    matched_text[needle] = text[:220]
+        return {
+            "wanted": wanted,
+            "matched": matched,
+            "matched_text": matched_text,
+            "samples": samples,
+            "scanned_nodes": len(self.nodes),
+            "truncated": self.truncated,
+        }
+
+    def rows(self, max_nodes: int = 1200) -> tuple[list[tuple[str, str, str, str]], bool]:
+        rows: list[tuple[str, str, str, str]] = []
+        for role, name, description, text_value in self.nodes:
+            if not any((role, name, description, text_value)):
+                continue
+            if len(rows) >= max_nodes:
+                return rows, True
+            rows.append((role[:120], name[:200], description[:300], text_value[:300]))
+        return rows, self.truncated
+
+
+def accessibility_snapshot(navigator, app_ref: dict[str, object], probe: str) -> AccessibilitySnapshot | None:
+    if not callable(getattr(navigator, "_walk", None)):
         return None
     app = _refresh_app_ref(navigator, app_ref)
     if app is None:
         return None
+    # Only the timeout dump shows roles; the signal probes match on texts alone.
+    with_roles = probe == "artifacts"
+    snapshot = app_ref.get("snapshot")
+    if (
+        isinstance(snapshot, AccessibilitySnapshot)
+        and snapshot.root is app
+        and snapshot.age() <= SNAPSHOT_TTL_SECONDS[probe]
+        and (snapshot.with_roles or not with_roles)
+    ):
+        return snapshot
+    snapshot = AccessibilitySnapshot.capture(navigator, app, with_roles)
+    app_ref["snapshot"] = snapshot
+    return snapshot
+
+
+def _collect_fragment_debug_snapshot(
+    navigator,
+    app_ref: dict[str, object],
+    fragments: list[str],
+    probe: str = "artifacts",
+) -> dict[str, object] | None:
     try:
-        return snapshot_fn(app, fragments)
+        snapshot = accessibility_snapshot(navigator, app_ref, probe)
     except Exception:
         try:
-            app = navigator.find_app_root()
-            app_ref["app"] = app
-        except Exception:
-            return None
-        try:
-            return snapshot_fn(app, fragments)
+            app_ref["app"] = navigator.find_app_root()
+            snapshot = accessibility_snapshot(navigator, app_ref, probe)
         except Exception:
             return None
+    return snapshot.fragment_debug(fragments) if snapshot is not None else None
 
 
 def _format_fragment_debug_info(debug_snapshot: object, sample_limit: int = 5) -> str:
@@ -748,21 +1510,23 @@ def _format_fragment_debug_info(debug_snapshot: object, sample_limit: int = 5) -
     missing_fragments = [wanted[idx] for idx, ok in enumerate(matched) if idx < len(wanted) and not ok]
     samples = list(debug_snapshot.get("samples", []) or [])[:sample_limit]
     scanned_nodes = int(debug_snapshot.get("scanned_nodes", 0) or 0)
+    truncated = "+" if debug_snapshot.get("truncated") else ""
     return (
         f"; matched={matched_fragments} missing={missing_fragments} "
-        f"scanned_nodes={scanned_nodes} sample_texts={samples}"
+        f"scanned_nodes={scanned_nodes}{truncated} sample_texts={samples}"
     )
 
 
-def _node_debug_fields(node, navigator) -> tuple[str, str, str, str]:
+def _node_debug_fields(node, navigator, with_role: bool = True) -> tuple[str, str, str, str]:
     role = ""
     name = ""
     description = ""
     text_value = ""
-    try:
-        role = _compact_text(str(node.get_role_name() or ""))
-    except Exception:
-        role = _compact_text(str(getattr(node, "roleName", "") or ""))
+    if with_role:
+        try:
+            role = _compact_text(str(node.get_role_name() or ""))
+        except Exception:
+            role = _compact_text(str(getattr(node, "roleName", "") or ""))
     try:
         name = _compact_text(str(node.get_name() or ""))
     except Exception:
@@ -780,29 +1544,12 @@ def _node_debug_fields(node, navigator) -> tuple[str, str, str, str]:
         try:
             char_count = int(atspi.Text.get_character_count(node) or 0)
             if char_count > 0:
-                text_value = _compact_text(str(atspi.Text.get_text(node, 0, min(char_count, 1024)) or ""))
+                text_value = _compact_text(str(atspi.Text.get_text(node, 0, min(char_count, 4096)) or ""))
         except Exception:
             pass
     return role, name, description, text_value
 
 
-def _collect_accessibility_rows(navigator, app, max_nodes: int = 1200) -> tuple[list[tuple[str, str, str, str]], bool]:
-    walk_fn = getattr(navigator, "_walk", None)
-    if not callable(walk_fn):
-        return [], False
-    rows: list[tuple[str, str, str, str]] = []
-    truncated = False
-    for node in walk_fn(app):
-        if len(rows) >= max_nodes:
-            truncated = True
-            break
-        role, name, description, text_value = _node_debug_fields(node, navigator)
-        if not any((role, name, description, text_value)):
-            continue
-        rows.append((role[:120], name[:200], description[:300], text_value[:300]))
-    return rows, truncated
-
-
 def _render_accessibility_dump_html(
     route_key: str,
     fragments: list[str],
@@ -861,7 +1608,7 @@ def _capture_timeout_screenshot(output_path: Path, display: str, window_id: str
             return
         except Exception:
             pass
-    subprocess.run(["import", "-display", display, "-window", "root", str(output_path)], check=True)
+    capture_root(output_path, display)
 
 
 def _write_timeout_artifacts(
@@ -892,12 +1639,12 @@ def _write_timeout_artifacts(
     debug_snapshot = _collect_fragment_debug_snapshot(navigator, app_ref, fragments)
     rows: list[tuple[str, str, str, str]] = []
     truncated = False
-    app = _refresh_app_ref(navigator, app_ref)
-    if app is not None:
-        try:
-            rows, truncated = _collect_accessibility_rows(navigator, app, max_nodes=1400)
-        except Exception as exc:
-            print(f"[capture] warning: failed to collect AT-SPI rows for '{route_key}': {exc}", flush=True)
+    try:
+        snapshot = accessibility_snapshot(navigator, app_ref, "artifacts")
+        if snapshot is not None:
+            rows, truncated = snapshot.rows(max_nodes=1400)
+    except Exception as exc:
+        print(f"[capture] warning: failed to collect AT-SPI rows for '{route_key}': {exc}", flush=True)
     try:
         dump_html = _render_accessibility_dump_html(
             route_key=route_key,
@@ -938,53 +1685,6 @@ def _write_timeout_artifacts(
     return artifacts
 
 
-def _collect_accessibility_texts(navigator, app, max_nodes: int = 1600) -> list[str]:
-    walk_fn = getattr(navigator, "_walk", None)
-    if not callable(walk_fn):
-        return []
-    atspi = getattr(navigator, "Atspi", None)
-    texts: list[str] = []
-    scanned = 0
-    for node in walk_fn(app):
-        scanned += 1
-        if scanned > max_nodes:
-            break
-        node_texts: list[str] = []
-        for attr in ("name", "description", "text"):
-            try:
-                value = getattr(node, attr, "")
-            except Exception:
-                value = ""
-            normalized = _normalize_text(str(value or ""))
-            if normalized:
-                node_texts.append(normalized)
-        if atspi is not None:
-            try:
-                name = _normalize_text(str(node.get_name() or ""))
-                if name:
-                    node_texts.append(name)
-            except Exception:
-                pass
-            try:
-                description = _normalize_text(str(node.get_description() or ""))
-                if description:
-                    node_texts.append(description)
-            except Exception:
-                pass
-            try:
-                char_count = int(atspi.Text.get_character_count(node) or 0)
-                if char_count > 0:
-                    snippet = _normalize_text(str(atspi.Text.get_text(node, 0, min(char_count, 4096)) or ""))
-                    if snippet:
-                        node_texts.append(snippet)
-            except Exception:
-                pass
-        for text in node_texts:
-            if text:
-                texts.append(text)
-    return texts
-
-
 def _count_distinct_ipv4_tokens(texts: list[str]) -> int:
     tokens: set[str] = set()
     for text in texts:
@@ -1018,8 +1718,7 @@ def wait_for_route_result_signal(
         return
     fragments, require_all, timeout = signal
     timeout = max(float(timeout), MIN_ROUTE_SIGNAL_TIMEOUT_SECONDS)
-    has_text_fragments = getattr(navigator, "has_text_fragments", None)
-    if not callable(has_text_fragments):
+    if not callable(getattr(navigator, "_walk", None)):
         return
 
     last_refresh = [0.0]
@@ -1039,14 +1738,16 @@ def wait_for_route_result_signal(
                 return False
         try:
             last_probe_error[0] = ""
-            if bool(has_text_fragments(app, fragments, require_all)):
+            snapshot = accessibility_snapshot(navigator, app_ref, "predicate")
+            if snapshot is None:
+                return False
+            if snapshot.has_text_fragments(fragments, require_all):
                 return True
             if route_key == "subnet":
                 # Some AT-SPI stacks expose numeric subnet outputs but not the
                 # corresponding labels. Treat distinct result IP values as
                 # completion when labels are missing.
-                texts = _collect_accessibility_texts(navigator, app, max_nodes=1800)
-                last_subnet_ipv4_count[0] = _count_distinct_ipv4_tokens(texts)
+                last_subnet_ipv4_count[0] = _count_distinct_ipv4_tokens(snapshot.texts())
                 if last_subnet_ipv4_count[0] >= 4:
                     return True
             return False
@@ -1058,26 +1759,111 @@ def wait_for_route_result_signal(
                 pass
             return False
 
+    wanted = [_normalize_text(fragment) for fragment in fragments if fragment]
+    matched = [False] * len(wanted)
+    subnet_texts: set[str] = set()
+    walked_app: list[object] = [None]
+
+    def scan_texts(texts: list[str]) -> None:
+        for text in texts:
+            for idx, needle in enumerate(wanted):
+                if not matched[idx] and needle in text:
+                    matched[idx] = True
+        if route_key == "subnet":
+            subnet_texts.update(texts)
+            last_subnet_ipv4_count[0] = _count_distinct_ipv4_tokens(list(subnet_texts))
+
+    def signal_matched() -> bool:
+        if wanted and (all(matched) if require_all else any(matched)):
+            return True
+        return route_key == "subnet" and last_subnet_ipv4_count[0] >= 4
+
+    def full_check() -> bool:
+        # Walk the freshly resolved app and restart the incremental match state
+        # from what is on screen right now.
+        app = navigator.find_app_root()
+        app_ref["app"] = app
+        if watcher is not None:
+            watcher.app = app
+        # Share the full walk with the progress and timeout probes.
+        snapshot = AccessibilitySnapshot.capture(navigator, app, with_roles=False)
+        app_ref["snapshot"] = snapshot
+        matched[:] = [False] * len(wanted)
+        subnet_texts.clear()
+        scan_texts(snapshot.texts())
+        walked_app[0] = app
+        return signal_matched()
+
+    def event_predicate(changed: list[object], recheck: bool) -> bool:
+        try:
+            last_probe_error[0] = ""
+            if walked_app[0] is None or recheck:
+                # Some toolkits (Compose/Java bridges) never emit change events
+                # for result widgets, so the full walk also repeats periodically.
+                return full_check()
+            for node in changed:
+                try:
+                    scan_texts(AccessibilitySnapshot.capture(navigator, node, with_roles=False).texts())
+                except Exception:
+                    # Nodes can vanish between the event and the walk.
+                    continue
+            # Fragments seen in separate events may not all still be present;
+            # only one walk of the whole app at a single moment confirms them.
+            return signal_matched() and full_check()
+        except Exception as exc:
+            last_probe_error[0] = f"{type(exc).__name__}: {exc}"
+            return False
+
     interval = 0.4
     started = time.monotonic()
     next_progress_log = started + 2.5
+    next_full_check = started + ROUTE_SIGNAL_RECHECK_SECONDS
     completed = False
-    while time.monotonic() - started < timeout:
-        if predicate():
-            completed = True
-            break
-        now = time.monotonic()
-        if now >= next_progress_log:
-            progress_snapshot = _collect_fragment_debug_snapshot(navigator, app_ref, fragments)
-            progress_info = _format_fragment_debug_info(progress_snapshot, sample_limit=3)
-            probe_error_info = f"; probe_error={last_probe_error[0]}" if last_probe_error[0] else ""
-            print(
-                f"[capture] waiting for route signal '{route_key}' "
-                f"{(now - started):.1f}/{timeout:.1f}s{progress_info}{probe_error_info}",
-                flush=True,
-            )
-            next_progress_log = now + 2.5
-        time.sleep(interval)
+    # Subscribe before the initial walk so no change slips in between.
+    watcher = create_signal_watcher(navigator)
+    try:
+        changed: list[object] = []
+        while time.monotonic() - started < timeout:
+            if watcher is not None:
+                recheck = time.monotonic() >= next_full_check
+                if recheck:
+                    next_full_check = time.monotonic() + ROUTE_SIGNAL_RECHECK_SECONDS
+                if event_predicate(changed, recheck):
+                    completed = True
+                    break
+            elif predicate():
+                completed = True
+                break
+            now = time.monotonic()
+            if now >= next_progress_log:
+                if watcher is not None:
+                    # The shared snapshot only reflects the last full walk; events
+                    # may have matched more since, so report the live match state.
+                    progress_info = (
+                        f"; matched={[needle for needle, ok in zip(wanted, matched) if ok]} "
+                        f"missing={[needle for needle, ok in zip(wanted, matched) if not ok]}"
+                    )
+                else:
+                    progress_snapshot = _collect_fragment_debug_snapshot(navigator, app_ref, fragments, probe="progress")
+                    progress_info = _format_fragment_debug_info(progress_snapshot, sample_limit=3)
+                probe_error_info = f"; probe_error={last_probe_error[0]}" if last_probe_error[0] else ""
+                print(
+                    f"[capture] waiting for route signal '{route_key}' "
+                    f"{(now - started):.1f}/{timeout:.1f}s{progress_info}{probe_error_info}",
+                    flush=True,
+                )
+                next_progress_log = now + 2.5
+            if watcher is not None:
+                now = time.monotonic()
+                wait = min(next_progress_log, next_full_check, started + timeout) - now
+                if walked_app[0] is None:
+                    wait = min(wait, interval)
+                changed = watcher.changed_nodes(max(0.0, wait))
+            else:
+                time.sleep(interval)
+    finally:
+        if watcher is not None:
+            watcher.close()
 
     if not completed:
         artifacts = _write_timeout_artifacts(
@@ -1243,37 +2029,163 @@ def perform_route_action(route_key: str, display: str, window_id: str) -> None:
         time.sleep(8.0)
 
 
-def run() -> int:
-    args = parse_args()
-    tarball = Path(args.tarball).resolve()
-    if not tarball.exists():
-        raise FileNotFoundError(f"Tarball not found: {tarball}")
+def select_routes(spec: str | None) -> list[tuple[str, object, str]]:
+    if not spec:
+        return list(ROUTES)
+    known: dict[str, tuple[str, object, str]] = {}
+    for route in ROUTES:
+        known[route[0]] = route
+        known[route[2]] = route
+    wanted = [item.strip() for item in spec.split(",") if item.strip()]
+    unknown = [item for item in wanted if item not in known]
+    if unknown:
+        raise ValueError(f"Unknown route(s) {unknown}; expected keys from {[route[2] for route in ROUTES]}")
+    selected = {known[item][0] for item in wanted}
+    return [route for route in ROUTES if route[0] in selected]
 
-    output_dir = Path(args.output_dir).resolve()
-    output_dir.mkdir(parents=True, exist_ok=True)
 
-    if not args.no_xvfb and shutil.which("Xvfb") is None:
-        raise RuntimeError("Xvfb is required but not found in PATH.")
-    if shutil.which("import") is None:
-        raise RuntimeError("ImageMagick `import` is required but not found in PATH.")
-    if shutil.which("traceroute") is None:
-        raise RuntimeError("`traceroute` is required but not found in PATH.")
+def shard_routes(routes: list[tuple[str, object, str]], workers: int) -> list[list[tuple[str, object, str]]]:
+    shards = [routes[idx::workers] for idx in range(workers)]
+    return [shard for shard in shards if shard]
+
+
+def allocate_worker_displays(base_display: str, count: int) -> list[str]:
+    match = re.fullmatch(r":(\d+)(?:\.\d+)?", base_display.strip())
+    if not match:
+        raise ValueError(f"--workers needs a local display like ':99', got {base_display!r}")
+    number = int(match.group(1))
+    displays: list[str] = []
+    while len(displays) < count:
+        # Skip displays already held by another X server.
+        if not Path(f"/tmp/.X{number}-lock").exists() and not Path(f"/tmp/.X11-unix/X{number}").exists():
+            displays.append(f":{number}")
+        number += 1
+    return displays
 
+
+_worker_output_lock = threading.Lock()
+
+
+def _relay_worker_output(index: int, proc: subprocess.Popen[str]) -> None:
+    if proc.stdout is None:
+        return
+    for line in proc.stdout:
+        with _worker_output_lock:
+            print(f"[worker {index}] {line.rstrip()}", flush=True)
+
+
+def run_workers(
+    args: argparse.Namespace,
+    tarball: Path,
+    output_dir: Path,
+    routes: list[tuple[str, object, str]],
+) -> int:
+    if args.no_xvfb:
+        raise RuntimeError(
+            "--workers starts its own Xvfb display and window manager per worker and cannot be combined "
+            "with --no-xvfb; drop --no-xvfb (and the external Xvfb/openbox) to run workers."
+        )
+    if shutil.which("dbus-run-session") is None:
+        raise RuntimeError("`dbus-run-session` is required for --workers but not found in PATH.")
+    # Focus and click handling behave differently without a window manager,
+    # so give every worker display the same openbox session CI uses.
+    window_manager = args.window_manager or ("openbox" if shutil.which("openbox") else None)
+    if window_manager is None:
+        print("[capture] openbox not found in PATH; worker displays run without a window manager.", flush=True)
+
+    shards = shard_routes(routes, args.workers)
+    displays = allocate_worker_displays(args.display, len(shards))
+    script = str(Path(__file__).resolve())
+    workers: list[tuple[int, list[tuple[str, object, str]], subprocess.Popen[str], threading.Thread]] = []
+    try:
+        for index, (display, shard) in enumerate(zip(displays, shards), start=1):
+            # A private session bus per worker keeps each AT-SPI registry
+            # limited to that worker's app instance.
+            cmd = [
+                "dbus-run-session",
+                "--",
+                sys.executable,
+                script,
+                "--tarball",
+                str(tarball),
+                "--output-dir",
+                str(output_dir),
+                "--display",
+                display,
+                "--screen",
+                args.screen,
+                "--startup-timeout",
+                str(args.startup_timeout),
+                "--click-delay",
+                str(args.click_delay),
+                "--routes",
+                ",".join(filename for filename, _, _ in shard),
+            ]
+            if window_manager:
+                cmd += ["--window-manager", window_manager]
+            print(
+                f"[capture] worker {index}: display={display} routes={[route_key for _, _, route_key in shard]}",
+                flush=True,
+            )
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+                preexec_fn=os.setsid,
+            )
+            relay = threading.Thread(target=_relay_worker_output, args=(index, proc), daemon=True)
+            relay.start()
+            workers.append((index, shard, proc, relay))
+
+        failed: list[str] = []
+        for index, shard, proc, relay in workers:
+            returncode = proc.wait()
+            relay.join()
+            if returncode != 0:
+                failed.append(f"worker {index} (exit {returncode}): {[filename for filename, _, _ in shard]}")
+    finally:
+        for _, _, proc, _ in workers:
+            kill_process_tree(proc)
+
+    if failed:
+        raise RuntimeError("Screenshot workers failed:\n" + "\n".join(failed))
+    return 0
+
+
+def capture_routes(
+    args: argparse.Namespace,
+    tarball: Path,
+    output_dir: Path,
+    routes: list[tuple[str, object, str]],
+    display: str,
+) -> int:
     with tempfile.TemporaryDirectory(prefix="nortools-screenshots-") as tmp:
         workdir = Path(tmp)
         binary = extract_tarball(tarball, workdir)
         navigator = create_navigator()
 
         env = os.environ.copy()
-        env["DISPLAY"] = args.display
+        env["DISPLAY"] = display
         env.setdefault("LANG", "C.UTF-8")
         env["NORTOOLS_DISABLE_UPDATER"] = "1"
-        os.environ["DISPLAY"] = args.display
+        os.environ["DISPLAY"] = display
 
         xvfb: subprocess.Popen[bytes] | None = None
         if not args.no_xvfb:
             xvfb = subprocess.Popen(
-                ["Xvfb", args.display, "-screen", "0", args.screen, "-ac"],
+                ["Xvfb", display, "-screen", "0", args.screen, "-ac"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                env=env,
+                preexec_fn=os.setsid,
+            )
+            time.sleep(1.0)
+        window_manager: subprocess.Popen[bytes] | None = None
+        if xvfb is not None and args.window_manager:
+            window_manager = subprocess.Popen(
+                shlex.split(args.window_manager),
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
                 env=env,
@@ -1281,8 +2193,8 @@ def run() -> int:
             )
             time.sleep(1.0)
         app_proc: subprocess.Popen[bytes] | None = None
-        wait_for(lambda: len(list_visible_window_ids(args.display)) > 0, timeout=5.0, interval=0.25)
-        baseline_window_ids = set(list_visible_window_ids(args.display))
+        wait_for(lambda: len(list_visible_window_ids(display)) > 0, timeout=5.0, interval=0.25)
+        baseline_window_ids = set(list_visible_window_ids(display))
 
         try:
             app_proc = subprocess.Popen(
@@ -1302,7 +2214,7 @@ def run() -> int:
                     return True
                 try:
                     window_ref["window_id"] = find_window_id(
-                        args.display,
+                        display,
                         app_proc.pid if app_proc else None,
                         ignore_ids=baseline_window_ids,
                     )
@@ -1315,10 +2227,10 @@ def run() -> int:
                     return window_ref["window_id"] is not None
 
             if not wait_for(app_ready, timeout=args.startup_timeout):
-                visible_windows = list_visible_window_ids(args.display)
+                visible_windows = list_visible_window_ids(display)
                 raise RuntimeError(
                     "Timed out waiting for NorTools accessibility tree. "
-                    f"display={args.display} pid={app_proc.pid if app_proc else 'n/a'} "
+                    f"display={display} pid={app_proc.pid if app_proc else 'n/a'} "
                     f"visible_window_count={len(visible_windows)}"
                 )
             if app_proc.poll() is not None:
@@ -1332,13 +2244,13 @@ def run() -> int:
                     candidates: list[str] = []
                     if window_ref["window_id"]:
                         candidates.append(window_ref["window_id"])
-                    active = get_active_window_id(args.display)
+                    active = get_active_window_id(display)
                     if active:
                         candidates.append(active)
                     try:
                         candidates.append(
                             find_window_id(
-                                args.display,
+                                display,
                                 app_proc.pid if app_proc else None,
                                 ignore_ids=baseline_window_ids,
                             )
@@ -1347,7 +2259,7 @@ def run() -> int:
                         last_error = exc
 
                     for candidate in candidates:
-                        if candidate and window_is_usable(args.display, candidate):
+                        if candidate and window_is_usable(display, candidate):
                             window_ref["window_id"] = candidate
                             return candidate
 
@@ -1378,7 +2290,7 @@ def run() -> int:
                     raise RuntimeError(f"Failed to click sidebar link '{link_name}' within {timeout}s: {last_error}") from last_error
                 raise RuntimeError(f"Failed to click sidebar link '{link_name}' within {timeout}s")
 
-            for filename, link_name, route_key in ROUTES:
+            for filename, link_name, route_key in routes:
                 if isinstance(link_name, tuple):
                     clicked = False
                     last_error: Exception | None = None
@@ -1399,27 +2311,57 @@ def run() -> int:
                 elif link_name:
                     click_with_retry(link_name)
                     time.sleep(args.click_delay)
-                if not window_is_usable(args.display, window_id, min_width=300, min_height=200):
+                if not window_is_usable(display, window_id, min_width=300, min_height=200):
                     window_id = resolve_main_window_id(timeout=15.0)
-                perform_route_action(route_key, args.display, window_id)
+                perform_route_action(route_key, display, window_id)
                 wait_for_route_result_signal(
                     route_key,
                     navigator,
                     app_ref,
-                    display=args.display,
+                    display=display,
                     window_id=window_id,
                     debug_output_dir=output_dir,
                 )
-                capture_screen_with_retry(output_dir / f"{filename}.png", args.display, window_id)
+                capture_screen_with_retry(output_dir / f"{filename}.png", display, window_id)
 
         finally:
+            close_input_backends()
+            close_screen_grabbers()
             if app_proc is not None:
                 kill_process_tree(app_proc)
+            if window_manager is not None:
+                kill_process_tree(window_manager)
             if xvfb is not None:
                 kill_process_tree(xvfb)
 
     return 0
 
 
+def run() -> int:
+    args = parse_args()
+    tarball = Path(args.tarball).resolve()
+    if not tarball.exists():
+        raise FileNotFoundError(f"Tarball not found: {tarball}")
+    if args.workers < 1:
+        raise ValueError("--workers must be >= 1")
+    routes = select_routes(args.routes)
+
+    output_dir = Path(args.output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if not args.no_xvfb and shutil.which("Xvfb") is None:
+        raise RuntimeError("Xvfb is required but not found in PATH.")
+    if args.window_manager and not args.no_xvfb and shutil.which(shlex.split(args.window_manager)[0]) is None:
+        raise RuntimeError(f"Window manager `{args.window_manager}` is not found in PATH.")
+    if shutil.which("import") is None and not in_memory_capture_available():
+        raise RuntimeError("ImageMagick `import` is required but not found in PATH.")
+    if shutil.which("traceroute") is None:
+        raise RuntimeError("`traceroute` is required but not found in PATH.")
+
+    if args.workers > 1 and len(routes) > 1:
+        return run_workers(args, tarball, output_dir, routes)
+    return capture_routes(args, tarball, output_dir, routes, args.display)
+
+
 if __name__ == "__main__":
     raise SystemExit(run())
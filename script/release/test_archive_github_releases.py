@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Tests for archive_github_releases.py.
+
+Run with ``python -m unittest script/release/test_archive_github_releases.py``
+(or pytest). API calls go to a local stand-in server, never to GitHub.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import archive_github_releases as archive  # noqa: E402
+
+
+def release(tag: str, body: str = "", release_id: int = 0, published: str = "2025-01-01T00:00:00Z") -> dict[str, Any]:
+    return {
+        "id": release_id or None,
+        "tag_name": tag,
+        "name": tag,
+        "published_at": published,
+        "created_at": published,
+        "html_url": f"https://example.test/{tag}",
+        "body": body or f"Notes for {tag}.",
+        "assets": [],
+    }
+
+
+def write_archive(path: Path, *parts: str) -> None:
+    path.write_text(archive.ARCHIVE_HEADER + "".join(parts), encoding="utf-8")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: StandInServer
+
+    def _handle(self) -> None:
+        self.server.requests.append((self.command, self.path, dict(self.headers)))
+        status, headers, body = self.server.respond(self.command, self.path, dict(self.headers))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_DELETE = _handle
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local stand-in for the GitHub API; ``respond`` maps a request to (status, headers, body)."""
+
+    def __init__(self, respond: Callable[[str, str, dict[str, str]], tuple[int, dict[str, str], bytes]]) -> None:
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.respond = respond
+        self.requests: list[tuple[str, str, dict[str, str]]] = []
+
+    @property
+    def root(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@contextlib.contextmanager
+def stand_in_api(respond: Callable[[str, str, dict[str, str]], tuple[int, dict[str, str], bytes]]):
+    server = StandInServer(respond)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    previous = archive.set_http_session(archive.HttpSession(timeout=5))
+    try:
+        with mock.patch.object(archive, "API_ROOT", server.root):
+            yield server
+    finally:
+        archive.set_http_session(previous).close()
+        server.shutdown()
+        server.server_close()
+
+
+class ParseArchiveMarkersTest(unittest.TestCase):
+    def test_pairs_entries_in_file_order(self) -> None:
+        data = (archive.ARCHIVE_HEADER + archive.release_entry(release("v2")) + "\n" + archive.release_entry(release("v1"))).encode()
+        layout = archive.parse_archive_markers(data)
+        self.assertEqual(layout.tags, ["v2", "v1"])
+        self.assertEqual(layout.header_end, len(archive.ARCHIVE_HEADER.encode()))
+        self.assertEqual(layout.diagnostics, [])
+        for tag, start, end in layout.entries:
+            self.assertTrue(data[start:end].startswith(archive.marker_for(tag).encode()))
+            self.assertTrue(data[start:end].endswith(archive.end_marker_for(tag).encode()))
+
+    def test_reports_marker_problems(self) -> None:
+        data = "\n".join(
+            [
+                archive.end_marker_for("orphan"),
+                archive.marker_for("a"),
+                "unterminated",
+                archive.marker_for("b"),
+                "b",
+                archive.end_marker_for("other"),
+                archive.marker_for("c"),
+                archive.end_marker_for("c"),
+                archive.marker_for("c"),
+                archive.end_marker_for("c"),
+            ],
+        ).encode()
+        layout = archive.parse_archive_markers(data)
+        self.assertEqual(
+            [(item.kind, item.tag) for item in layout.diagnostics],
+            [("orphan-end", "orphan"), ("unterminated", "a"), ("mismatched-end", "other"), ("duplicate", "c")],
+        )
+        # The mismatched end marker closes "b", so "c" after it is still found.
+        self.assertEqual(layout.tags, ["b", "c"])
+
+
+class ArchiveIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "archive.md"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def assert_offsets_match(self, index: archive.ArchiveIndex) -> None:
+        data = self.path.read_bytes()
+        for tag, entry in index.entries.items():
+            span = data[entry.offset : entry.offset + entry.length]
+            self.assertTrue(span.startswith(archive.marker_for(tag).encode()), tag)
+            self.assertTrue(span.endswith(archive.end_marker_for(tag).encode()), tag)
+            self.assertEqual(entry.sha, archive.entry_hash(span))
+        fresh = archive.ArchiveIndex(self.path)
+        fresh.rebuild()
+        self.assertEqual(fresh.entries, index.entries)
+
+    def test_appended_offsets_match_a_rescan(self) -> None:
+        metadata, appended, _ = archive.archive_releases(self.path, [release("v3"), release("v2"), release("v1")])
+        self.assertEqual(appended, ["v3", "v2", "v1"])
+        self.assertEqual([item["tag_name"] for item in metadata], appended)
+        self.assert_offsets_match(archive.ArchiveIndex.load(self.path))
+
+    def test_rebuilds_when_the_archive_changes(self) -> None:
+        archive.archive_releases(self.path, [release("v1")])
+        self.assertTrue(archive.ArchiveIndex(self.path)._load_fresh())
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write("\n" + archive.release_entry(release("v2")))
+        self.assertFalse(archive.ArchiveIndex(self.path)._load_fresh())
+        index = archive.ArchiveIndex.load(self.path)
+        self.assertEqual(index.tags(), ["v1", "v2"])
+        self.assert_offsets_match(index)
+
+    def test_splice_same_and_different_length(self) -> None:
+        archive.archive_releases(self.path, [release("v3", "three"), release("v2", "two"), release("v1", "one")])
+        index = archive.ArchiveIndex.load(self.path)
+        same = archive.release_entry(release("v2", "TWO")).encode().rstrip(b"\n")
+        archive.splice_archive_entries(self.path, index, {"v2": same})
+        self.assert_offsets_match(index)
+        longer = archive.release_entry(release("v3", "three, now much longer")).encode().rstrip(b"\n")
+        shorter = archive.release_entry(release("v1", "1")).encode().rstrip(b"\n")
+        archive.splice_archive_entries(self.path, index, {"v3": longer, "v1": shorter})
+        self.assert_offsets_match(index)
+        text = self.path.read_text(encoding="utf-8")
+        self.assertIn("TWO", text)
+        self.assertIn("three, now much longer", text)
+
+    def test_remove_entries_shifts_offsets(self) -> None:
+        archive.archive_releases(self.path, [release(f"v{number}") for number in range(5, 0, -1)])
+        index = archive.ArchiveIndex.load(self.path)
+        archive.remove_archive_entries(self.path, index, ["v4", "v2"])
+        self.assertEqual(index.tags(), ["v5", "v3", "v1"])
+        self.assertNotIn("v4", self.path.read_text(encoding="utf-8"))
+        self.assert_offsets_match(index)
+
+    def test_refresh_changed_replaces_only_the_body(self) -> None:
+        archive.archive_releases(self.path, [release("v1", "original")])
+        renamed = release("v1", "original")
+        renamed["name"] = "Renamed"
+        self.assertEqual(archive.archive_releases(self.path, [renamed], refresh_changed=True)[2], [])
+        edited = release("v1", "edited notes")
+        edited["name"] = "Renamed"
+        self.assertEqual(archive.archive_releases(self.path, [edited], refresh_changed=True)[2], ["v1"])
+        text = self.path.read_text(encoding="utf-8")
+        self.assertIn("edited notes", text)
+        self.assertIn("## v1\n", text)
+        self.assert_offsets_match(archive.ArchiveIndex.load(self.path))
+
+    def test_reorder_refuses_unpaired_markers(self) -> None:
+        write_archive(
+            self.path,
+            archive.release_entry(release("a")),
+            "\n" + archive.marker_for("b") + "\nNotes for b.\n\n",
+            archive.release_entry(release("c")),
+        )
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            archive.reorder_archive_file(self.path, [release("c"), release("a")])
+        self.assertIn("not reordering", stderr.getvalue())
+        self.assertIn("Notes for b.", self.path.read_text(encoding="utf-8"))
+
+
+class PruneJournalTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "journal.jsonl"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_resumes_past_a_torn_final_line(self) -> None:
+        journal = archive.PruneJournal(self.path)
+        journal.start("o/r", [release("v2", release_id=2), release("v1", release_id=1)], delete_tags=True)
+        journal.record_release(release("v2", release_id=2))
+        journal.record_tag("v2")
+        journal._fh.close()
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write('{"op":"done","kind":"release","id":')
+
+        resumed = archive.PruneJournal(self.path)
+        pending = resumed.load_pending("o/r")
+        self.assertIsNotNone(pending)
+        planned, delete_tags = pending
+        self.assertEqual([item["id"] for item in planned], [2, 1])
+        self.assertTrue(delete_tags)
+        self.assertEqual(resumed.done_releases, {2})
+        self.assertEqual(resumed.done_tags, {"v2"})
+        self.assertIsNone(archive.PruneJournal(self.path).load_pending("other/repo"))
+
+    def test_finished_runs_leave_nothing_pending(self) -> None:
+        journal = archive.PruneJournal(self.path)
+        journal.start("o/r", [release("v1", release_id=1)], delete_tags=False)
+        journal.close(failures=1)
+        self.assertIsNone(archive.PruneJournal(self.path).load_pending("o/r"))
+        journal.start("o/r", [release("v1", release_id=1)], delete_tags=False)
+        journal.close(failures=0)
+        self.assertFalse(self.path.exists())
+
+
+class PlanApplyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.archive_path = self.root / "archive.md"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_apply_skips_releases_whose_notes_changed(self) -> None:
+        releases = [release("v2", release_id=2), release("v1", release_id=1)]
+        archive.archive_releases(self.archive_path, releases)
+        store = archive.ArchiveFile(self.archive_path)
+        plan_path = self.root / "plan.json"
+        archive.write_prune_plan(plan_path, "o/r", store, [], None, releases, delete_tags=False)
+        plan = json.loads(plan_path.read_text(encoding="utf-8"))
+        self.assertEqual([item["archive_sha"] for item in plan["prune"]], [entry.sha for entry in store.lookup().values()])
+
+        index = archive.ArchiveIndex.load(self.archive_path)
+        edited = archive.release_entry(release("v1", "edited after planning")).encode().rstrip(b"\n")
+        archive.splice_archive_entries(self.archive_path, index, {"v1": edited})
+
+        def respond(method: str, path: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+            return 204, {}, b""
+
+        args = argparse.Namespace(
+            apply=str(plan_path),
+            repo="some/fork",
+            repo_given=False,
+            archive=str(self.archive_path),
+            mirror_assets=None,
+            prune_journal=str(self.root / "journal.jsonl"),
+            prune_concurrency=1,
+            max_retries=0,
+            tag_backend="api",
+            search_db=None,
+        )
+        with stand_in_api(respond) as server, contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            result = archive.apply_prune_plan(args, "token", self.root)
+        self.assertEqual(result, 1)
+        self.assertEqual([(method, path) for method, path, _ in server.requests], [("DELETE", "/repos/o/r/releases/2")])
+
+    def test_apply_refuses_a_plan_without_a_repository(self) -> None:
+        plan_path = self.root / "plan.json"
+        plan_path.write_text(json.dumps({"version": archive.PRUNE_PLAN_VERSION, "repo": None, "prune": []}), encoding="utf-8")
+        args = argparse.Namespace(apply=str(plan_path), repo=None, repo_given=False)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(archive.apply_prune_plan(args, "token", self.root), 2)
+
+
+class ReleaseListTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_cache_revalidates_with_etag(self) -> None:
+        body = json.dumps([release("v1", release_id=1)]).encode()
+
+        def respond(method: str, path: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+            if headers.get("If-None-Match") == '"abc"':
+                return 304, {"ETag": '"abc"'}, b""
+            return 200, {"ETag": '"abc"', "Content-Type": "application/json"}, body
+
+        cache = archive.ResponseCache(Path(self.tmp.name))
+        with stand_in_api(respond) as server:
+            url = archive.releases_page_url("o/r", 1)
+            first = cache.get(url, None)
+            second = cache.get(url, None)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.status, 200)
+        self.assertEqual((cache.fetched, cache.revalidated, cache.stored), (1, 1, 1))
+        self.assertNotIn("If-None-Match", server.requests[0][2])
+        self.assertEqual(server.requests[1][2].get("If-None-Match"), '"abc"')
+
+    def test_clear_keeps_the_watermark_state(self) -> None:
+        root = Path(self.tmp.name)
+        state_path = archive.default_state_path(root, "o/r")
+        archive.save_fetch_state(state_path, {"repo": "o/r", "backlog_pruned": True})
+        (root / f"{'0' * 64}.json").write_text("{}", encoding="utf-8")
+        self.assertEqual(archive.ResponseCache(root).clear(), 1)
+        self.assertTrue(state_path.exists())
+
+    def test_pages_follow_the_link_header_in_order(self) -> None:
+        per_page = 2
+        tags = [f"v{number}" for number in range(5, 0, -1)]
+
+        def respond(method: str, path: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+            page = int(query["page"][0])
+            batch = [release(tag, release_id=int(tag[1:])) for tag in tags[(page - 1) * per_page : page * per_page]]
+            last = f'<{archive.API_ROOT}/repos/o/r/releases?per_page={per_page}&page=3>; rel="last"'
+            return 200, {"Link": last, "Content-Type": "application/json"}, json.dumps(batch).encode()
+
+        with mock.patch.object(archive, "RELEASES_PER_PAGE", per_page), stand_in_api(respond) as server:
+            serial = [item["tag_name"] for item in archive.project_releases(archive.iter_release_pages("o/r", None))]
+            concurrent = [
+                item["tag_name"] for item in archive.project_releases(archive.iter_release_pages("o/r", None, page_workers=3))
+            ]
+        self.assertEqual(serial, tags)
+        self.assertEqual(concurrent, tags)
+        self.assertEqual(archive.last_page_number(archive.ApiResponse(200, {"link": last_link(server.root)}, b"")), 3)
+
+
+def last_link(root: str) -> str:
+    return f'<{root}/repos/o/r/releases?per_page=2&page=2>; rel="next", <{root}/repos/o/r/releases?per_page=2&page=3>; rel="last"'
+
+
+if __name__ == "__main__":
+    unittest.main()